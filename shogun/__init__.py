@@ -28,6 +28,7 @@ from trading_calendars import get_calendar
 from .data_portal.data_portal import DataPortal
 from .instruments.instrument_finder import InstrumentFinder
 from .data_portal.hdf_daily_bars import HdfDailyBarReader
+from .data_portal.mmap_daily_bars import MmapDailyBarReader, MmapDailyBarWriter
 from .data_portal.history_loader import ContinuousFutureAdjustmentReader
 from .data_portal.continuous_future_reader import ContinuousFutureSessionBarReader
 from .database.future_root_factory import FutureRootFactory
@@ -44,6 +45,8 @@ __all__ = [
     'DataPortal',
     'InstrumentFinder',
     'HdfDailyBarReader',
+    'MmapDailyBarReader',
+    'MmapDailyBarWriter',
     'ContinuousFutureAdjustmentReader',
     'ContinuousFutureSessionBarReader',
     'FutureRootFactory',
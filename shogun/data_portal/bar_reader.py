@@ -13,6 +13,7 @@
 # limitations under the License.
 from abc import ABCMeta, abstractmethod, abstractproperty
 from six import with_metaclass
+import pandas as pd
 
 
 class NoDataOnDate(Exception):
@@ -41,6 +42,10 @@ OHLCV = ('open', 'high', 'low', 'close', 'volume')
 
 
 class BarReader(with_metaclass(ABCMeta, object)):
+    # Whether the reader may be read from several threads at once, e.g. by
+    # the history prefetch worker while the simulation reads spot values.
+    thread_safe = False
+
     @abstractproperty
     def data_frequency(self):
         pass
@@ -139,3 +144,21 @@ class BarReader(with_metaclass(ABCMeta, object)):
             dt as a vantage point.
         """
         pass
+
+    def get_last_traded_dts(self, assets, dt):
+        """
+        Vectorized ``get_last_traded_dt`` over many assets.
+        Parameters
+        ----------
+        assets : iterable of zipline.asset.Asset
+            The assets for which to get the last traded minute.
+        dt : pd.Timestamp
+            The minute at which to start searching for the last traded minute.
+        Returns
+        -------
+        last_traded : pd.DatetimeIndex
+            The dt of the last trade for each asset, NaT for assets with no
+            trades on or before ``dt``.
+        """
+        return pd.DatetimeIndex(
+            [self.get_last_traded_dt(asset, dt) for asset in assets])
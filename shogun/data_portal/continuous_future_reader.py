@@ -5,6 +5,9 @@ from shogun.data_portal.session_bars import SessionBarReader
 
 
 class ContinuousFutureSessionBarReader(SessionBarReader):
+    # Reads update the roll schedules cached by the shared roll finders,
+    # which are also used by the DataPortal without a lock.
+    thread_safe = False
 
     def __init__(self, bar_reader, roll_finders):
         self._bar_reader = bar_reader
@@ -75,6 +78,21 @@ class ContinuousFutureSessionBarReader(SessionBarReader):
                 if roll_date is not None:
                     start = sessions[end_loc + 1]
 
+        # Fetch every contract of every partition once, with all of the
+        # requested fields, then scatter the partitions into the output.
+        contracts = list(dict.fromkeys(
+            exchange_symbol
+            for partitions in partitions_by_instrument.values()
+            for exchange_symbol, _, _, _, _ in partitions
+        ))
+        contract_ix = {exchange_symbol: j for j, exchange_symbol in enumerate(contracts)}
+        data_columns = [column for column in columns if column != 'exchange_symbol']
+        if contracts and data_columns:
+            data = dict(zip(data_columns, self._bar_reader.load_raw_arrays(
+                data_columns, start_date, end_date, contracts)))
+        else:
+            data = {}
+
         for column in columns:
             if column != 'volume' and column != 'exchange_symbol':
                 out = np.full(shape, np.nan)
@@ -87,8 +105,8 @@ class ContinuousFutureSessionBarReader(SessionBarReader):
 
                 for exchange_symbol, start, end, start_loc, end_loc in partitions:
                     if column != 'exchange_symbol':
-                        result = self._bar_reader.load_raw_arrays(
-                            [column], start, end, [exchange_symbol])[0][:, 0]
+                        result = data[column][start_loc:end_loc + 1,
+                                              contract_ix[exchange_symbol]]
                     else:
                         result = str(exchange_symbol)
                     out[start_loc:end_loc + 1, i] = result
@@ -177,7 +195,7 @@ class ContinuousFutureSessionBarReader(SessionBarReader):
                                       instrument.active))
         if sid is None:
             return pd.NaT
-        contract = rf.instrument_finder.retrieve_instrument(exchange_symbol)
+        contract = rf.instrument_finder.retrieve_instrument(sid)
         return self._bar_reader.get_last_traded_dt(contract, dt)
 
     @property
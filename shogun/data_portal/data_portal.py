@@ -1,6 +1,11 @@
+from collections import namedtuple
+
 import pandas as pd
+from pandas import isnull
 import numpy as np
 from numpy import float64, int64, nan
+from toolz import unique
+
 from shogun.errors import HistoryWindowStartsBeforeData
 from shogun.utils.memoize import remember_last, weak_lru_cache
 
@@ -8,6 +13,7 @@ from shogun.instruments.instrument import (
     Instrument,
     Equity,
     Future,
+    FutureOption,
 )
 from shogun.instruments.continuous_futures import ContinuousFuture
 from shogun.instruments.instrument_finder import (
@@ -15,8 +21,10 @@ from shogun.instruments.instrument_finder import (
     InstrumentConvertible,
     PricingDataAssociable,
 )
+from shogun.data_portal.bar_reader import NoDataOnDate
 from shogun.data_portal.history_loader import (
     DailyHistoryLoader,
+    MinuteHistoryLoader,
 )
 from shogun.data_portal.continuous_future_reader import (
     ContinuousFutureSessionBarReader,
@@ -26,9 +34,11 @@ from shogun.instruments.roll_finder import (
     VolumeRollFinder
 )
 from shogun.data_portal.resample import (
+    ReindexMinuteBarReader,
     ReindexSessionBarReader,
 )
 from shogun.data_portal.dispatch_bar_reader import (
+    InstrumentDispatchMinuteBarReader,
     InstrumentDispatchSessionBarReader,
 )
 
@@ -52,9 +62,27 @@ OHLCVPOI_FIELDS = frozenset([
     "open", "high", "low", "close", "volume", "price", "open_interest"
 ])
 
+DEFAULT_MINUTE_HISTORY_PREFETCH = 1560
 DEFAULT_DAILY_HISTORY_PREFETCH = 0
+DEFAULT_DAILY_HISTORY_PREFETCH_THRESHOLD = None
 
+_DEF_M_HIST_PREFETCH = DEFAULT_MINUTE_HISTORY_PREFETCH
 _DEF_D_HIST_PREFETCH = DEFAULT_DAILY_HISTORY_PREFETCH
+_DEF_D_HIST_PREFETCH_THRESHOLD = DEFAULT_DAILY_HISTORY_PREFETCH_THRESHOLD
+
+DEFAULT_INDEX_CACHE_SIZE = 100
+
+# A window of history, with its index along each axis.
+HistoryWindow = namedtuple(
+    'HistoryWindow',
+    ['values', 'sessions', 'exchange_symbols'],
+)
+
+# A window of several fields of history, with its index along each axis.
+HistoryPanel = namedtuple(
+    'HistoryPanel',
+    ['values', 'fields', 'sessions', 'exchange_symbols'],
+)
 
 class DataPortal(object):
     """Interface to all of the data that a shogun simulation needs.
@@ -94,6 +122,16 @@ class DataPortal(object):
         The last session to make available in session-level data.
     last_available_minute : pd.Timestamp, optional
         The last minute to make available in minute-level data.
+    minute_history_prefetch_length : int, optional
+        The number of minutes past the requested end which are loaded with
+        each minute history window.
+    daily_history_prefetch_length : int, optional
+        The number of sessions past the requested end which are loaded with
+        each daily history window.
+    daily_history_prefetch_threshold : int, optional
+        When a daily history window can serve at most this many more
+        sessions, its next block is loaded in the background. If None,
+        history windows are loaded synchronously.
     """
 
     def __init__(self,
@@ -104,7 +142,12 @@ class DataPortal(object):
                  future_daily_reader=None,
                  adjustment_reader=None,
                  last_available_session=None,
-                 daily_history_prefetch_length=_DEF_D_HIST_PREFETCH):
+                 equity_minute_reader=None,
+                 future_minute_reader=None,
+                 last_available_minute=None,
+                 minute_history_prefetch_length=_DEF_M_HIST_PREFETCH,
+                 daily_history_prefetch_length=_DEF_D_HIST_PREFETCH,
+                 daily_history_prefetch_threshold=_DEF_D_HIST_PREFETCH_THRESHOLD):
 
         self.trading_calendar = trading_calendar
 
@@ -131,7 +174,22 @@ class DataPortal(object):
             else:
                 self._last_available_session = None
 
+        if last_available_minute:
+            self._last_available_minute = last_available_minute
+        else:
+            # Infer the last minute from the provided readers.
+            last_minutes = [
+                reader.last_available_dt
+                for reader in [equity_minute_reader, future_minute_reader]
+                if reader is not None
+            ]
+            if last_minutes:
+                self._last_available_minute = min(last_minutes)
+            else:
+                self._last_available_minute = None
+
         aligned_session_readers = {}
+        aligned_minute_readers = {}
 
         aligned_equity_session_reader = self._ensure_reader_aligned(
             equity_daily_reader)
@@ -139,6 +197,12 @@ class DataPortal(object):
         aligned_future_session_reader = self._ensure_reader_aligned(
             future_daily_reader)
 
+        aligned_equity_minute_reader = self._ensure_reader_aligned(
+            equity_minute_reader)
+
+        aligned_future_minute_reader = self._ensure_reader_aligned(
+            future_minute_reader)
+
         self._roll_finders = {
             'calendar': CalendarRollFinder(self.trading_calendar,
                                            self.instrument_finder),
@@ -149,6 +213,7 @@ class DataPortal(object):
 
         if aligned_future_session_reader is not None:
             aligned_session_readers[Future] = aligned_future_session_reader
+            aligned_session_readers[FutureOption] = aligned_future_session_reader
             self._roll_finders['volume'] = VolumeRollFinder(
                 self.trading_calendar,
                 self.instrument_finder,
@@ -160,6 +225,13 @@ class DataPortal(object):
                     self._roll_finders,
                 )
 
+        if aligned_equity_minute_reader is not None:
+            aligned_minute_readers[Equity] = aligned_equity_minute_reader
+
+        if aligned_future_minute_reader is not None:
+            aligned_minute_readers[Future] = aligned_future_minute_reader
+            aligned_minute_readers[FutureOption] = aligned_future_minute_reader
+
         _dispatch_session_reader = InstrumentDispatchSessionBarReader(
             self.trading_calendar,
             self.instrument_finder,
@@ -171,6 +243,25 @@ class DataPortal(object):
             'daily': _dispatch_session_reader,
         }
 
+        if aligned_minute_readers:
+            _dispatch_minute_reader = InstrumentDispatchMinuteBarReader(
+                self.trading_calendar,
+                self.instrument_finder,
+                aligned_minute_readers,
+                self._last_available_minute,
+            )
+            self._pricing_readers['minute'] = _dispatch_minute_reader
+            self._minute_history_loader = MinuteHistoryLoader(
+                self.trading_calendar,
+                _dispatch_minute_reader,
+                self._adjustment_reader,
+                self.instrument_finder,
+                self._roll_finders,
+                prefetch_length=minute_history_prefetch_length,
+            )
+        else:
+            self._minute_history_loader = None
+
         self._history_loader = DailyHistoryLoader(
             self.trading_calendar,
             _dispatch_session_reader,
@@ -178,6 +269,7 @@ class DataPortal(object):
             self.instrument_finder,
             self._roll_finders,
             prefetch_length=daily_history_prefetch_length,
+            prefetch_threshold=daily_history_prefetch_threshold,
         )
 
         self._first_trading_day = first_trading_day
@@ -187,6 +279,13 @@ class DataPortal(object):
             self.trading_calendar.all_sessions.get_loc(self._first_trading_day)
             if self._first_trading_day is not None else None
         )
+        self._first_trading_minute_loc = (
+            self.trading_calendar.all_minutes.searchsorted(
+                self.trading_calendar.open_and_close_for_session(
+                    self._first_trading_day)[0])
+            if self._first_trading_day is not None and aligned_minute_readers
+            else None
+        )
 
     def _ensure_reader_aligned(self, reader):
         if reader is None:
@@ -194,6 +293,13 @@ class DataPortal(object):
 
         if reader.trading_calendar.name == self.trading_calendar.name:
             return reader
+        elif reader.data_frequency == 'minute':
+            return ReindexMinuteBarReader(
+                self.trading_calendar,
+                reader,
+                self._first_available_session,
+                self._last_available_session
+            )
         elif reader.data_frequency == 'session':
             return ReindexSessionBarReader(
                 self.trading_calendar,
@@ -202,6 +308,9 @@ class DataPortal(object):
                 self._last_available_session
             )
 
+    def _get_pricing_reader(self, data_frequency):
+        return self._pricing_readers[data_frequency]
+
     def get_last_traded_dt(self, instrument, dt, data_frequency):
         """
         Given an instrument and dt, returns the last traded dt from the viewpoint
@@ -211,6 +320,15 @@ class DataPortal(object):
         return self._get_pricing_reader(data_frequency).get_last_traded_dt(
             instrument, dt)
 
+    def get_last_traded_dts(self, instruments, dt, data_frequency):
+        """
+        Vectorized ``get_last_traded_dt`` over many instruments. Returns a
+        DatetimeIndex with NaT for instruments which have not traded on or
+        before dt.
+        """
+        return self._get_pricing_reader(data_frequency).get_last_traded_dts(
+            instruments, dt)
+
     @staticmethod
     def _is_extra_source(instrument, field, map):
         """
@@ -277,7 +395,7 @@ class DataPortal(object):
             else:
                 return self._get_minute_spot_value(instrument, field, dt)
 
-    def get_spot_value(self, instruments, field, dt, data_frequency):
+    def get_spot_value(self, instruments, field, dt, data_frequency, raw=False):
         """
         Public API method that returns a scalar value representing the value
         of the desired instrument's field at either the given dt.
@@ -293,6 +411,11 @@ class DataPortal(object):
         data_frequency : str
             The frequency of the data to query; i.e. whether the data is
             'daily' or 'minute' bars
+        raw : bool
+            If ``instruments`` is an iterable, return the values as a float64
+            array, as ``get_spot_values`` does, rather than as a list. Only
+            the fields 'open', 'high', 'low', 'close', 'volume',
+            'open_interest' and 'price' can be read as an array.
         Returns
         -------
         value : float, int, or pd.Timestamp
@@ -326,6 +449,11 @@ class DataPortal(object):
                 dt,
                 data_frequency,
             )
+        elif raw:
+            if field not in OHLCVPOI_FIELDS:
+                raise ValueError(
+                    "Field {0!r} cannot be read with raw=True.".format(field))
+            return self.get_spot_values(instruments, field, dt, data_frequency)
         else:
             get_single_instrument_value = self._get_single_instrument_value
             return [
@@ -339,6 +467,91 @@ class DataPortal(object):
                 for instrument in instruments
             ]
 
+    def get_spot_values(self, instruments, field, dt, data_frequency):
+        """
+        Vectorized ``get_spot_value`` over many instruments.
+        In daily mode the values of every instrument are read with one
+        ``load_raw_arrays`` call on the session of ``dt``, which the dispatch
+        reader splits into one call per instrument type.
+        Parameters
+        ----------
+        instruments : iterable of Instrument or ContinuousFuture
+            The instruments whose data is desired.
+        field : {'open', 'high', 'low', 'close', 'volume', 'open_interest',
+                 'price'}
+            The desired field of the instruments.
+        dt : pd.Timestamp
+            The timestamp for the desired values.
+        data_frequency : str
+            The frequency of the data to query; i.e. whether the data is
+            'daily' or 'minute' bars
+        Returns
+        -------
+        values : np.ndarray[float64]
+            The spot value of ``field`` for each of ``instruments``, in the
+            order given. The volume of an instrument without a bar on the
+            session is 0.
+        """
+        if field not in OHLCVPOI_FIELDS:
+            raise KeyError("Invalid column: " + str(field))
+
+        instruments = list(instruments)
+        session_label = self.trading_calendar.minute_to_session_label(dt)
+        out = np.full(len(instruments), nan)
+
+        if data_frequency != 'daily' or not all(
+                isinstance(instrument, (Instrument, ContinuousFuture))
+                for instrument in instruments):
+            get_single_instrument_value = self._get_single_instrument_value
+            out[:] = [
+                get_single_instrument_value(
+                    session_label,
+                    instrument,
+                    field,
+                    dt,
+                    data_frequency,
+                )
+                for instrument in instruments
+            ]
+            return out
+
+        # Instruments are alive from their start date through the session of
+        # their end date; a missing date leaves that side open.
+        min_ns = np.iinfo(int64).min
+        max_ns = np.iinfo(int64).max
+        start_dates = np.array([
+            min_ns if instrument.start_date is None else instrument.start_date.value
+            for instrument in instruments
+        ], dtype=int64)
+        end_dates = np.array([
+            max_ns if instrument.end_date is None else instrument.end_date.value
+            for instrument in instruments
+        ], dtype=int64)
+        alive = (start_dates <= dt.value) & (end_dates >= session_label.value)
+        alive_ix = np.flatnonzero(alive)
+
+        if len(alive_ix):
+            column = 'close' if field == 'price' else field
+            values = self._get_pricing_reader('daily').load_raw_arrays(
+                [column],
+                session_label,
+                session_label,
+                [instruments[i] for i in alive_ix],
+            )[0]
+            out[alive_ix] = values[0]
+
+        if field == 'volume':
+            out[~alive] = 0
+        elif field == 'price':
+            # Instruments without a close on the session are forward filled
+            # from their last close, one at a time.
+            for i in alive_ix[np.isnan(out[alive_ix])]:
+                out[i] = self._get_daily_spot_value(
+                    instruments[i], 'price', session_label,
+                )
+
+        return out
+
     def _get_minute_spot_value(self, instrument, column, dt, ffill=False):
         reader = self._get_pricing_reader('minute')
 
@@ -539,7 +752,8 @@ class DataPortal(object):
                            frequency,
                            field,
                            data_frequency,
-                           ffill=True):
+                           ffill=True,
+                           raw=False):
         """
         Public API method that returns a dataframe containing the requested
         history window.  Data is fully adjusted.
@@ -559,9 +773,14 @@ class DataPortal(object):
         ffill: boolean
             Forward-fill missing values. Only has effect if field
             is 'price'.
+        raw: boolean
+            Return a HistoryWindow of the array of the window and its
+            indexes rather than a dataframe. The indexes are cached, so
+            repeated calls for the same window do not rebuild them.
         Returns
         -------
-        A dataframe containing the requested data.
+        A dataframe containing the requested data, or a HistoryWindow if
+        ``raw``.
         """
         if field not in OHLCVPOI_FIELDS and field != 'exchange_symbol':
             raise ValueError("Invalid field: {0}".format(field))
@@ -571,79 +790,200 @@ class DataPortal(object):
                 "bar_count must be >=1, but got {}".format(bar_count)
             )
 
+        field_to_use = "close" if field == "price" else field
         if frequency == "1d":
-            if field == "price":
-                df = self._get_history_daily_window(instruments, end_dt, bar_count,
-                                                    "close", data_frequency)
-            else:
-                df = self._get_history_daily_window(instruments, end_dt, bar_count,
-                                                    field, data_frequency)
+            window = self._get_history_daily_window(instruments, end_dt,
+                                                    bar_count, field_to_use,
+                                                    data_frequency)
         elif frequency == "1m":
-            if field == "price":
-                df = self._get_history_minute_window(instruments, end_dt, bar_count,
-                                                     "close")
-            else:
-                df = self._get_history_minute_window(instruments, end_dt, bar_count,
-                                                     field)
+            window = self._get_history_minute_window(instruments, end_dt,
+                                                     bar_count, field_to_use)
         else:
             raise ValueError("Invalid frequency: {0}".format(frequency))
 
         # forward-fill price
-        if field == "price":
-            if frequency =="1m":
-                ffill_data_frequency = 'minute'
-            elif frequency == "1d":
-                ffill_data_frequency = 'daily'
-            else:
-                raise Exception(
-                        "Only 1d and 1m are supported for forward-filling.")
-
-            instruments_with_leading_nan = np.where(isnull(df.iloc[0]))[0]
-
-            history_start, history_end = df.index[[0, -1]]
-            if ffill_data_frequency == 'daily' and data_frequency == 'minute':
-                # When we're looking for a daily value, but we haven't seen any
-                # volume in today's minute bars yet, we need to use the
-                # previous day's ffilled daily price. Using today's daily price
-                # could yield a value from later today.
-                history_start -= self.trading_calendar.day
-
-            initial_values = []
-            for instrument in df.columns[instruments_with_leading_nan]:
-                last_traded = self.get_last_traded_dt(
-                    instrument,
-                    history_start,
-                    ffill_data_frequency,
-                )
-                if isnull(last_traded):
-                    initial_values.append(nan)
-                else:
-                    initial_values.append(
-                        self.get_adjusted_value(
-                            instrument,
-                            field,
-                            dt=last_traded,
-                            perspective_dt=history_end,
-                            data_frequency=ffill_data_frequency,
-                        )
-                    )
-            # Set leading values for instruments that were missing data, then ffill.
-            df.ix[0, instruments_with_leading_nan] = np.array(
-                initial_values,
-                dtype=np.float64
+        if field == "price" and ffill and len(instruments):
+            self._ffill_price_window(window.values, window.sessions,
+                                     instruments, frequency, data_frequency)
+
+        if raw:
+            return window
+        return pd.DataFrame(
+            window.values,
+            index=window.sessions,
+            columns=window.exchange_symbols,
+        )
+
+    def _ffill_price_window(self, values, sessions, instruments, frequency,
+                            data_frequency):
+        """
+        Forward-fill, in place, a window of prices of ``instruments``.
+        Leading missing values are filled from the last traded price before
+        the window, and the values after the end date of each instrument are
+        set back to NaN.
+        Parameters
+        ----------
+        values : np.ndarray[float64]
+            The prices, of shape (len(sessions), len(instruments)).
+        sessions : pd.DatetimeIndex
+            The dts of the rows of ``values``.
+        instruments : list of Instrument
+            The instruments of the columns of ``values``.
+        """
+        if frequency =="1m":
+            ffill_data_frequency = 'minute'
+        elif frequency == "1d":
+            ffill_data_frequency = 'daily'
+        else:
+            raise Exception(
+                    "Only 1d and 1m are supported for forward-filling.")
+
+        history_start, history_end = sessions[[0, -1]]
+        if ffill_data_frequency == 'daily' and data_frequency == 'minute':
+            # When we're looking for a daily value, but we haven't seen any
+            # volume in today's minute bars yet, we need to use the
+            # previous day's ffilled daily price. Using today's daily price
+            # could yield a value from later today.
+            history_start -= self.trading_calendar.day
+
+        instruments_with_leading_nan = np.flatnonzero(isnull(values[0]))
+        if len(instruments_with_leading_nan):
+            values[0, instruments_with_leading_nan] = self._get_last_traded_prices(
+                [instruments[i] for i in instruments_with_leading_nan],
+                history_start,
+                history_end,
+                ffill_data_frequency,
+            )
+
+        # Forward-fill by taking, for each cell, the value at the most recent
+        # row at or before it which is not missing.
+        num_rows, num_columns = values.shape
+        rows = np.where(isnull(values), 0, np.arange(num_rows)[:, None])
+        np.maximum.accumulate(rows, axis=0, out=rows)
+        values[:] = values[rows, np.arange(num_columns)]
+
+        # forward-filling will incorrectly produce values after the end of
+        # an instrument's lifetime, so write NaNs back over the instrument's
+        # end_date.
+        end_dates = np.array(
+            [np.iinfo(int64).max if instrument.end_date is None
+             else instrument.end_date.value for instrument in instruments],
+            dtype=int64,
+        )
+        normed_index = sessions.normalize().values.astype(
+            'datetime64[ns]').view(int64)
+        values[normed_index[:, None] > end_dates[None, :]] = nan
+
+    def _get_last_traded_prices(self, instruments, dt, perspective_dt,
+                                data_frequency):
+        """
+        Returns a float64 array of the adjusted price of each instrument on
+        its last traded dt at or before ``dt``, which is NaN for instruments
+        that have not traded by ``dt``.
+        """
+        last_traded_dts = self.get_last_traded_dts(
+            instruments,
+            dt,
+            data_frequency,
+        )
+        out = np.full(len(instruments), nan)
+        traded = np.flatnonzero(~isnull(last_traded_dts))
+        # Instruments which last traded on the same dt are priced together.
+        traded_dts = last_traded_dts[traded]
+        unique_dts, groups = np.unique(traded_dts.asi8, return_inverse=True)
+        for k, last_traded in enumerate(unique_dts):
+            last_traded = pd.Timestamp(last_traded, tz='UTC')
+            positions = traded[groups == k]
+            group = [instruments[i] for i in positions]
+            prices = self.get_spot_values(group, 'price', last_traded,
+                                          data_frequency)
+            for j, instrument in enumerate(group):
+                if isinstance(instrument, Equity):
+                    prices[j] *= self.get_adjustments(
+                        instrument, 'price', last_traded, perspective_dt)[0]
+            out[positions] = prices
+        return out
+
+    def get_history_panel(self,
+                          instruments,
+                          end_dt,
+                          bar_count,
+                          fields,
+                          data_frequency='daily',
+                          ffill=True):
+        """
+        Public API method that returns daily history windows of several
+        fields at once. Data is fully adjusted.
+        Parameters
+        ----------
+        instruments : list of shogun.instruments.Instrument objects
+            The instruments whose data is desired.
+        end_dt : pd.Timestamp
+            The last dt of the window.
+        bar_count: int
+            The number of bars desired.
+        fields: list of string
+            The desired fields of the instruments.
+        data_frequency: string
+            The frequency of the data to query; i.e. whether the data is
+            'daily' or 'minute' bars.
+        ffill: boolean
+            Forward-fill missing values. Only has effect on the 'price'
+            field.
+        Returns
+        -------
+        HistoryPanel
+            ``values`` is a float64 array of shape (len(fields), bar_count,
+            len(instruments)), which is indexed by ``fields``, ``sessions``
+            and ``exchange_symbols``.
+        Notes
+        -----
+        The windows of every field are loaded with one read of the pricing
+        reader, rather than a read per field as with repeated calls to
+        ``get_history_window``.
+        """
+        fields = list(fields)
+        for field in fields:
+            if field not in OHLCVPOI_FIELDS:
+                raise ValueError("Invalid field: {0}".format(field))
+
+        if bar_count <1:
+            raise ValueError(
+                "bar_count must be >=1, but got {}".format(bar_count)
             )
-            df.fillna(method='ffill', inplace=True)
-
-            # forward-filling will incorrectly produce values after the end of
-            # an instrument's lifetime, so write NaNs back over the instrument's
-            # end_date.
-            normed_index = df.index.normalize()
-            for instrument in df.columns:
-                if history_end >= instrument.end_date:
-                    # if the window extends past the instrument's end date, set
-                    # all post-end-date values to NaN in that instrument's series
-                    df.loc[normed_index > instrument.end_date, instrument] = nan
-        return df
+
+        session = self.trading_calendar.minute_to_session_label(end_dt)
+        days_for_window = self._get_days_for_window(session, bar_count)
+        exchange_symbols = self._get_exchange_symbol_index(
+            tuple(i.exchange_symbol for i in instruments)
+        )
+
+        values = np.full(
+            (len(fields), len(days_for_window), len(instruments)),
+            nan,
+        )
+        if len(instruments):
+            columns = ['close' if field == 'price' else field
+                       for field in fields]
+            read_columns = list(unique(columns))
+            data = self._history_loader.history_panel(
+                instruments,
+                days_for_window,
+                read_columns,
+                data_frequency == 'minute',
+            )
+            for k, column in enumerate(columns):
+                values[k] = data[read_columns.index(column)]
+
+            price_rows = [k for k, field in enumerate(fields)
+                          if field == 'price']
+            if ffill and price_rows:
+                prices = values[price_rows[0]]
+                self._ffill_price_window(prices, days_for_window, instruments,
+                                         '1d', data_frequency)
+                values[price_rows] = prices
+
+        return HistoryPanel(values, fields, days_for_window, exchange_symbols)
 
     def _get_history_daily_window(self,
                                   instruments,
@@ -652,26 +992,77 @@ class DataPortal(object):
                                   field_to_use,
                                   data_frequency):
         """
-        Internal method that returns a dataframe containing history bars
+        Internal method that returns a HistoryWindow containing history bars
         of daily frequency for the given instruments.
         """
         session = self.trading_calendar.minute_to_session_label(end_dt)
         days_for_window = self._get_days_for_window(session, bar_count)
+        exchange_symbols = self._get_exchange_symbol_index(
+            tuple(i.exchange_symbol for i in instruments)
+        )
 
         if len(instruments) == 0:
-            return pd.DataFrame(None,
-                                index=days_for_window,
-                                columns=None)
+            return HistoryWindow(np.empty((len(days_for_window), 0)),
+                                 days_for_window,
+                                 exchange_symbols)
 
         data = self._get_history_daily_window_data(
             instruments, days_for_window, end_dt, field_to_use, data_frequency
         )
-        return pd.DataFrame(
-            data,
-            index=days_for_window,
-            columns=[i.exchange_symbol for i in instruments]#instruments
+        return HistoryWindow(data, days_for_window, exchange_symbols)
+
+    @weak_lru_cache(DEFAULT_INDEX_CACHE_SIZE)
+    def _get_exchange_symbol_index(self, exchange_symbols):
+        return pd.Index(exchange_symbols)
+
+    def _get_history_minute_window(self,
+                                   instruments,
+                                   end_dt,
+                                   bar_count,
+                                   field_to_use):
+        """
+        Internal method that returns a HistoryWindow containing history bars
+        of minute frequency for the given instruments.
+        """
+        if self._minute_history_loader is None:
+            raise ValueError("Minute history requires a minute bar reader.")
+
+        minutes_for_window = self._get_minutes_for_window(end_dt, bar_count)
+        exchange_symbols = self._get_exchange_symbol_index(
+            tuple(i.exchange_symbol for i in instruments)
         )
 
+        if len(instruments) == 0:
+            return HistoryWindow(np.empty((len(minutes_for_window), 0)),
+                                 minutes_for_window,
+                                 exchange_symbols)
+
+        data = self._minute_history_loader.history(instruments,
+                                                   minutes_for_window,
+                                                   field_to_use,
+                                                   False)
+        return HistoryWindow(data, minutes_for_window, exchange_symbols)
+
+    def _get_minutes_for_window(self, end_dt, bar_count):
+        tms = self.trading_calendar.all_minutes
+        # The window ends on the last market minute at or before end_dt.
+        end_loc = tms.searchsorted(end_dt, side='right') - 1
+        start_loc = end_loc - bar_count + 1
+        if start_loc < self._first_trading_minute_loc:
+            suggested_start_day = self.trading_calendar.minute_to_session_label(
+                tms[self._first_trading_minute_loc + bar_count]
+            ) + self.trading_calendar.day
+            raise HistoryWindowStartsBeforeData(
+                first_trading_day=self._first_trading_day.date(),
+                bar_count=bar_count,
+                suggested_start_day=suggested_start_day.date(),
+            )
+        return self._get_minute_index(start_loc, end_loc)
+
+    @weak_lru_cache(DEFAULT_INDEX_CACHE_SIZE)
+    def _get_minute_index(self, start_loc, end_loc):
+        return self.trading_calendar.all_minutes[start_loc:end_loc + 1]
+
     def _get_history_daily_window_data(self,
                                        instruments,
                                        days_for_window,
@@ -713,7 +1104,11 @@ class DataPortal(object):
                     self._first_trading_day_loc + bar_count
                 ].date(),
             )
-        return tds[start_loc:end_loc + 1]
+        return self._get_session_index(start_loc, end_loc)
+
+    @weak_lru_cache(DEFAULT_INDEX_CACHE_SIZE)
+    def _get_session_index(self, start_loc, end_loc):
+        return self.trading_calendar.all_sessions[start_loc:end_loc + 1]
 
     def _get_daily_window_data(self,
                                instruments,
@@ -781,3 +1176,11 @@ class DataPortal(object):
     @property
     def adjustment_reader(self):
         return self._adjustment_reader
+
+    def close(self):
+        """
+        Stops the history prefetch workers, waiting for any pending reads.
+        """
+        self._history_loader.close()
+        if self._minute_history_loader is not None:
+            self._minute_history_loader.close()
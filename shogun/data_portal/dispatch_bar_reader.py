@@ -16,10 +16,12 @@ from abc import ABCMeta, abstractmethod
 
 from numpy import (
     full,
+    iinfo,
     nan,
     int64,
     zeros
 )
+from pandas import DatetimeIndex
 from six import iteritems, with_metaclass
 from itertools import chain
 
@@ -80,6 +82,10 @@ class InstrumentDispatchBarReader(with_metaclass(ABCMeta)):
     def trading_calendar(self):
         return self._trading_calendar
 
+    @lazyval
+    def thread_safe(self):
+        return all(r.thread_safe for r in self._readers.values())
+
     @lazyval
     def last_available_dt(self):
         if self._last_available_dt is not None:
@@ -93,14 +99,34 @@ class InstrumentDispatchBarReader(with_metaclass(ABCMeta)):
 
     def get_value(self, exchange_symbol, dt, field):
         #changed 10/29
-        instrument = self._instrument_finder.retrieve_instrument(exchange_symbol)
+        if isinstance(exchange_symbol, str):
+            instrument = self._instrument_finder.retrieve_instrument(exchange_symbol)
+        else:
+            instrument = exchange_symbol
         r = self._readers[type(instrument)]
-        return r.get_value(instrument.exchange_symbol, dt, field)
+        return r.get_value(instrument, dt, field)
 
     def get_last_traded_dt(self, instrument, dt):
         r = self._readers[type(instrument)]
         return r.get_last_traded_dt(instrument, dt)
 
+    def get_last_traded_dts(self, instruments, dt):
+        instruments = [
+            self._instrument_finder.retrieve_instrument(t) if isinstance(t, str) else t
+            for t in instruments
+        ]
+        groups = {}
+        for i, instrument in enumerate(instruments):
+            positions, members = groups.setdefault(type(instrument), ([], []))
+            positions.append(i)
+            members.append(instrument)
+
+        out = full(len(instruments), iinfo(int64).min, dtype=int64)
+        for t, (positions, members) in iteritems(groups):
+            last_traded = self._readers[t].get_last_traded_dts(members, dt)
+            out[positions] = DatetimeIndex(last_traded).asi8
+        return DatetimeIndex(out.view('datetime64[ns]'), tz='UTC')
+
     def load_raw_arrays(self, fields, start_dt, end_dt, exchange_symbols):
         instrument_types = self._instrument_types
         exchange_symbol_groups = {t: [] for t in instrument_types}
@@ -144,3 +170,9 @@ class InstrumentDispatchSessionBarReader(InstrumentDispatchBarReader):
         return self.trading_calendar.sessions_in_range(
             self.first_trading_day,
             self.last_available_dt)
+
+
+class InstrumentDispatchMinuteBarReader(InstrumentDispatchBarReader):
+
+    def _dt_window_size(self, start_dt, end_dt):
+        return len(self.trading_calendar.minutes_in_range(start_dt, end_dt))
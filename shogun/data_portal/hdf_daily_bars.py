@@ -1,10 +1,13 @@
 from pandas import read_hdf, DatetimeIndex
 from trading_calendars import get_calendar
+import numpy as np
 import pandas as pd
 import os
 dirname = os.path.dirname(__file__)
 
 from shogun.utils.memoize import lazyval
+from shogun.utils.pandas_utils import read_hdf_session_bounds
+from shogun.instruments.instrument import FutureOption
 from shogun.data_portal.session_bars import SessionBarReader
 from shogun.data_portal.bar_reader import (
     NoDataAfterDate,
@@ -12,10 +15,323 @@ from shogun.data_portal.bar_reader import (
     NoDataOnDate,
 )
 
+BAR_COLUMNS = ('open', 'high', 'low', 'close', 'volume', 'open_interest')
+
+_NS_PER_DAY = 24 * 60 * 60 * 10 ** 9
+
+
+def _make_bar_out(column, shape):
+    """
+    Allocate an output array for ``column``. Volume and open interest
+    default to 0, prices default to nan.
+    """
+    if column == 'volume' or column == 'open_interest':
+        return np.zeros(shape, dtype=np.float64)
+    return np.full(shape, np.nan)
+
+
+class _ColumnarBars(object):
+    """
+    In-memory, columnar copy of a daily bar table.
+
+    The rows are sorted by (exchange_symbol, date) so that the rows of each
+    exchange_symbol are contiguous, and every field is held in its own
+    contiguous float64 array.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Bars indexed by ('date', 'exchange_symbol') with the columns listed
+        in ``columns``.
+    columns : tuple of str, optional
+        The fields to hold. Defaults to ``BAR_COLUMNS``.
+
+    Attributes
+    ----------
+    dates : np.ndarray[int64]
+        Epoch ns of each row.
+    columns : dict[str -> np.ndarray[float64]]
+        Map from field -> values of that field for each row.
+    first_row : dict
+        Map from exchange_symbol -> index of first row with that symbol.
+    last_row : dict
+        Map from exchange_symbol -> index of last row with that symbol.
+    """
+    def __init__(self, df, columns=BAR_COLUMNS):
+        df = df.reset_index().sort_values(
+            ['exchange_symbol', 'date'], kind='mergesort')
+
+        symbols = df['exchange_symbol'].values
+        self.dates = df['date'].values.astype('datetime64[ns]').view(np.int64)
+        self.columns = {
+            column: np.ascontiguousarray(df[column].values, dtype=np.float64)
+            for column in columns
+        }
+
+        if len(symbols):
+            starts = np.flatnonzero(
+                np.concatenate([[True], symbols[1:] != symbols[:-1]]))
+        else:
+            starts = np.array([], dtype=np.int64)
+        ends = np.append(starts[1:], len(symbols)) - 1
+
+        self.first_row = dict(zip(symbols[starts], starts))
+        self.last_row = dict(zip(symbols[starts], ends))
+
+    def _row_range(self, exchange_symbol, start_ns, end_ns):
+        """
+        Return the [lo, hi) row range of ``exchange_symbol`` between
+        ``start_ns`` and ``end_ns`` inclusive.
+        """
+        try:
+            first = self.first_row[exchange_symbol]
+            last = self.last_row[exchange_symbol]
+        except KeyError:
+            return 0, 0
+        dates = self.dates[first:last + 1]
+        lo = first + dates.searchsorted(start_ns)
+        hi = first + dates.searchsorted(end_ns, side='right')
+        return lo, hi
+
+    def load_raw_arrays(self, columns, sessions_ns, exchange_symbols):
+        """
+        Returns
+        -------
+        list of np.ndarray
+            A list with an entry per field of ndarrays with shape
+            (len(sessions_ns), len(exchange_symbols)).
+        """
+        shape = len(sessions_ns), len(exchange_symbols)
+        out = [_make_bar_out(column, shape) for column in columns]
+        if not len(sessions_ns):
+            return out
+
+        for j, exchange_symbol in enumerate(exchange_symbols):
+            lo, hi = self._row_range(
+                exchange_symbol, sessions_ns[0], sessions_ns[-1])
+            if lo == hi:
+                continue
+            dates = self.dates[lo:hi]
+            ix = sessions_ns.searchsorted(dates)
+            # Drop rows which do not fall on a session of the calendar.
+            on_session = sessions_ns[ix] == dates
+            ix = ix[on_session]
+            for column, array in zip(columns, out):
+                array[ix, j] = self.columns[column][lo:hi][on_session]
+        return out
+
+    def get_value(self, exchange_symbol, dt_ns, field):
+        """
+        Returns the value of ``field`` for ``exchange_symbol`` on the session
+        ``dt_ns``, or raises a KeyError if there is no such row.
+        """
+        lo, hi = self._row_range(exchange_symbol, dt_ns, dt_ns)
+        if lo == hi:
+            raise KeyError((exchange_symbol, dt_ns))
+        return self.columns[field][lo]
+
+
+class _SessionIndex(object):
+    """
+    O(1) lookup of the row holding a (exchange_symbol, session) pair of a
+    ``_ColumnarBars``.
+
+    Each exchange_symbol is assigned an integer id. For every id, the rows of
+    the sessions from the symbol's first to its last bar are laid out densely
+    in ``session_rows``, starting at ``span_start[sid]``, with -1 marking
+    sessions without a bar. The row of a pair is then
+    ``session_rows[span_start[sid] + session_ix - calendar_offset[sid]]``.
+
+    Parameters
+    ----------
+    bars : _ColumnarBars
+        The bars to index.
+    sessions_ns : np.ndarray[int64]
+        Epoch ns of the sessions of the reader.
+    """
+    def __init__(self, bars, sessions_ns):
+        symbols = sorted(bars.first_row, key=bars.first_row.get)
+        self.symbol_ids = {symbol: i for i, symbol in enumerate(symbols)}
+        self.session_ix = dict(zip(sessions_ns.tolist(), range(len(sessions_ns))))
+        self.sessions_ns = sessions_ns
+
+        first = np.array([bars.first_row[s] for s in symbols], dtype=np.int64)
+        last = np.array([bars.last_row[s] for s in symbols], dtype=np.int64)
+        row_sid = np.repeat(np.arange(len(symbols)), last - first + 1)
+        rows = np.arange(len(row_sid))
+
+        session_ix = sessions_ns.searchsorted(bars.dates)
+        valid = session_ix < len(sessions_ns)
+        valid[valid] = sessions_ns[session_ix[valid]] == bars.dates[valid]
+        row_sid = row_sid[valid]
+        session_ix = session_ix[valid]
+        rows = rows[valid]
+
+        num_symbols = len(symbols)
+        self.calendar_offset = np.zeros(num_symbols, dtype=np.int64)
+        self.span_len = np.zeros(num_symbols, dtype=np.int64)
+        if len(rows):
+            # Rows are sorted by (symbol, date), so the first and last row of
+            # each id hold its first and last session.
+            sids, first_ix = np.unique(row_sid, return_index=True)
+            last_ix = np.append(first_ix[1:], len(row_sid)) - 1
+            self.calendar_offset[sids] = session_ix[first_ix]
+            self.span_len[sids] = session_ix[last_ix] - session_ix[first_ix] + 1
+        self.span_start = np.concatenate([[0], np.cumsum(self.span_len)[:-1]]).astype(np.int64)
+
+        self.session_rows = np.full(int(self.span_len.sum()), -1, dtype=np.int64)
+        self.session_rows[
+            self.span_start[row_sid] + session_ix - self.calendar_offset[row_sid]
+        ] = rows
+
+    def row(self, exchange_symbol, dt_ns):
+        """
+        Returns the row of ``exchange_symbol`` on the session ``dt_ns``, or -1
+        if there is no such row.
+        """
+        try:
+            sid = self.symbol_ids[exchange_symbol]
+            k = self.session_ix[dt_ns] - self.calendar_offset[sid]
+        except KeyError:
+            return -1
+        if not 0 <= k < self.span_len[sid]:
+            return -1
+        return self.session_rows[self.span_start[sid] + k]
+
+    def rows(self, exchange_symbols, dts_ns):
+        """
+        Vectorized ``row`` over pairs of exchange_symbols and epoch ns.
+        """
+        sids = np.array([self.symbol_ids.get(s, -1) for s in exchange_symbols],
+                        dtype=np.int64)
+        out = np.full(sids.shape, -1, dtype=np.int64)
+        if not len(self.span_len):
+            return out
+        dts_ns = np.broadcast_to(np.asarray(dts_ns, dtype=np.int64), sids.shape)
+        session_ix = self.sessions_ns.searchsorted(dts_ns)
+        clipped = np.minimum(session_ix, len(self.sessions_ns) - 1)
+        valid = (sids >= 0) & (session_ix < len(self.sessions_ns)) & \
+            (self.sessions_ns[clipped] == dts_ns)
+
+        k = session_ix - self.calendar_offset[sids]
+        valid &= (k >= 0) & (k < self.span_len[sids])
+
+        out[valid] = self.session_rows[self.span_start[sids[valid]] + k[valid]]
+        return out
+
+
+class _TradedDates(object):
+    """
+    The sessions on which each exchange_symbol of a ``_ColumnarBars`` traded,
+    i.e. had a close and non-zero volume.
+
+    The traded dates of each symbol are stored as a contiguous, sorted run of
+    ``keys``, where the key of a date is ``sid * stride + day`` and ``day`` is
+    the number of days since the first bar of the table. The last traded date
+    of any number of (symbol, dt) pairs is then found with a single
+    ``searchsorted``.
+
+    Parameters
+    ----------
+    bars : _ColumnarBars
+        The bars to index.
+    """
+    def __init__(self, bars):
+        symbols = sorted(bars.first_row, key=bars.first_row.get)
+        self.symbol_ids = {symbol: i for i, symbol in enumerate(symbols)}
+
+        first = np.array([bars.first_row[s] for s in symbols], dtype=np.int64)
+        last = np.array([bars.last_row[s] for s in symbols], dtype=np.int64)
+        row_sid = np.repeat(np.arange(len(symbols)), last - first + 1)
+
+        if len(bars.dates):
+            self.base = bars.dates.min()
+            self.stride = (bars.dates.max() - self.base) // _NS_PER_DAY + 1
+        else:
+            self.base = 0
+            self.stride = 1
+
+        traded = ~np.isnan(bars.columns['close']) & (bars.columns['volume'] != 0)
+        self.dates = bars.dates[traded]
+        # Rows are sorted by (symbol, date), so the keys are sorted.
+        self.keys = row_sid[traded] * self.stride + \
+            (self.dates - self.base) // _NS_PER_DAY
+
+    def last_traded(self, exchange_symbols, dt_ns):
+        """
+        Returns the epoch ns of the last date on or before ``dt_ns`` on which
+        each of ``exchange_symbols`` traded, the NaT value where there is none.
+        """
+        sids = np.array([self.symbol_ids.get(s, -1) for s in exchange_symbols],
+                        dtype=np.int64)
+        out = np.full(sids.shape, np.iinfo(np.int64).min, dtype=np.int64)
+        if not len(self.keys):
+            return out
+        day = min(max((dt_ns - self.base) // _NS_PER_DAY, -1), self.stride - 1)
+        ix = self.keys.searchsorted(sids * self.stride + day, side='right') - 1
+        # When a symbol has no trade on or before dt, the key found belongs to
+        # an earlier symbol.
+        clipped = np.maximum(ix, 0)
+        found = (sids >= 0) & (ix >= 0) & (self.keys[clipped] // self.stride == sids)
+        out[found] = self.dates[clipped[found]]
+        return out
+
+
+class _HdfPartition(object):
+    """
+    A daily bar hdf file which is only opened when first used.
+
+    Parameters
+    ----------
+    path : str
+        The path of the hdf file.
+    in_memory : bool, optional
+        Whether the reader holds the whole file in memory, in which case the
+        traded dates are taken from that copy instead of another read.
+    """
+    def __init__(self, path, in_memory=False):
+        self.path = path
+        self._in_memory = in_memory
+
+    @lazyval
+    def session_bounds(self):
+        """
+        Epoch ns of the first and last sessions of the partition.
+        """
+        return read_hdf_session_bounds(self.path)
+
+    @lazyval
+    def df(self):
+        return read_hdf(self.path)
+
+    @lazyval
+    def columnar(self):
+        return _ColumnarBars(read_hdf(self.path))
+
+    @lazyval
+    def traded_dates(self):
+        if self._in_memory:
+            return _TradedDates(self.columnar)
+        # Only the fields needed to tell whether a bar traded are read.
+        columns = ('close', 'volume')
+        return _TradedDates(_ColumnarBars(
+            read_hdf(self.path, columns=list(columns)), columns))
+
+    def query(self, start_date, end_date, exchange_symbol=None):
+        query = "date>=" + start_date.strftime("%Y%m%d") + \
+                " & date<=" + end_date.strftime("%Y%m%d")
+        if exchange_symbol is not None:
+            query += " & exchange_symbol=" + "\"" + exchange_symbol + "\""
+        return read_hdf(self.path, where=query)
+
+
 #class HdfDailyBarReader(SessionBarReader):
 class HdfDailyBarReader(SessionBarReader):
     """
-    Reader for raw pricing data in InstrumentData.h5.
+    Reader for raw pricing data in InstrumentData.h5 and OptionData.h5.
+    Bars of FutureOption instruments are read from OptionData.h5, which is
+    only opened when an option is first requested; everything else is read
+    from InstrumentData.h5.
     Parameters
     ----------
     instrument_hdf : pandas hdf file
@@ -27,6 +343,10 @@ class HdfDailyBarReader(SessionBarReader):
         all of the data for all assets into memory and then indexing into that
         array for each day and asset pair.  Used to tune performance of reads
         when using a small or large number of instruments.
+    in_memory : bool, optional
+        If True, the pricing data is held in memory as per-column contiguous
+        arrays, and reads are served by slicing those arrays instead of
+        querying the hdf. Defaults to False.
     Attributes
     ----------
     The table with which this loader interacts contains the following
@@ -59,19 +379,69 @@ class HdfDailyBarReader(SessionBarReader):
     - Date
     - Exchange_symbol is the exchange_symbol of the row.
     """
-    def __init__(self, calendar, start_session=None, end_session=None, read_all_threshold= 3000):
-        self.df = read_hdf(dirname +'\..\database\_InstrumentData.h5')
-        # append option data here as a hack because we haven't fully ingested options yet
-        self.option_df = pd.read_hdf(dirname + '\..\database\_OptionData.h5')
-        self.df = self.df.append(self.option_df)
+    def __init__(self, calendar, start_session=None, end_session=None, read_all_threshold= 3000,
+                 in_memory=False):
+        # Option bars live in their own file, which is only opened when an
+        # option is first requested.
+        self._partitions = {
+            'instrument': _HdfPartition(dirname +'\..\database\_InstrumentData.h5',
+                                        in_memory),
+            'option': _HdfPartition(dirname + '\..\database\_OptionData.h5',
+                                    in_memory),
+        }
+        self._session_indexes = {}
 
+        if not start_session or not end_session:
+            start_ns, end_ns = self._partitions['instrument'].session_bounds
         if not start_session:
-            start_session = max(pd.Timestamp(min(self.df.index.get_level_values(0)),tz='UTC'),calendar.first_session)
+            start_session = max(pd.Timestamp(start_ns, tz='UTC'), calendar.first_session)
         if not end_session:
-            end_session = min(pd.Timestamp(max(self.df.index.get_level_values(0)),tz='UTC'),calendar.last_session)
+            end_session = min(pd.Timestamp(end_ns, tz='UTC'), calendar.last_session)
         self.calendar = calendar
         self._start_session = start_session
         self._end_session = end_session
+        self._read_all_threshold = read_all_threshold
+        self._in_memory = in_memory
+
+    @property
+    def df(self):
+        return self._partitions['instrument'].df
+
+    @property
+    def option_df(self):
+        return self._partitions['option'].df
+
+    def _partition_key(self, instrument):
+        """
+        Returns the key of the partition holding the bars of ``instrument``.
+        Exchange symbols passed as str are looked up in the instrument
+        partition.
+        """
+        if isinstance(instrument, FutureOption):
+            return 'option'
+        return 'instrument'
+
+    def _group_by_partition(self, instruments):
+        """
+        Returns a map from partition key -> (positions, exchange_symbols) of
+        the given instruments.
+        """
+        groups = {}
+        for i, instrument in enumerate(instruments):
+            positions, exchange_symbols = groups.setdefault(
+                self._partition_key(instrument), ([], []))
+            positions.append(i)
+            exchange_symbols.append(
+                instrument if type(instrument) is str else instrument.exchange_symbol)
+        return groups
+
+    def _session_index(self, key):
+        try:
+            return self._session_indexes[key]
+        except KeyError:
+            index = self._session_indexes[key] = _SessionIndex(
+                self._partitions[key].columnar, self.sessions.asi8)
+            return index
 
     @property
     def trading_calendar(self):
@@ -96,41 +466,110 @@ class HdfDailyBarReader(SessionBarReader):
         return self._end_session
 
     def get_last_traded_dt(self, instrument, day):
-        instrument_sessions = instrument.exchange_info.calendar.sessions_in_range(
-            self._start_session, self._end_session
-        )
-
-        try:
-            ix = instrument_sessions.get_loc(day)
-        except KeyError:
-            return NaT
+        """
+        Returns the last session on or before ``day`` on which ``instrument``
+        had a close and non-zero volume, or NaT if there is none.
+        """
+        return self.get_last_traded_dts([instrument], day)[0]
 
-        return day
+    def get_last_traded_dts(self, instruments, day):
+        """
+        Vectorized ``get_last_traded_dt`` over many instruments.
+        Returns
+        -------
+        pd.DatetimeIndex
+            The last traded session of each instrument, NaT where there is
+            none.
+        """
+        out = np.full(len(instruments), np.iinfo(np.int64).min, dtype=np.int64)
+        day_ns = pd.Timestamp(day).value
+        for key, (positions, symbols) in self._group_by_partition(instruments).items():
+            out[positions] = self._partitions[key].traded_dates.last_traded(symbols, day_ns)
+        return pd.DatetimeIndex(out.view('datetime64[ns]'), tz='UTC')
 
     def load_raw_arrays(self, columns, start_date, end_date, exchange_symbols):
-        out = []
-#        print(start_date)
-        exchange_symbols = [t.exchange_symbol if type(t) is not str else t for t in exchange_symbols]
-        for exchange_symbol in exchange_symbols:
-            query = "date>=" + start_date.strftime("%Y%m%d") + \
-                    " & date<=" + end_date.strftime("%Y%m%d") + \
-                    " & exchange_symbol=" + "\"" + exchange_symbol + "\""
-            result = read_hdf(dirname +'\..\database\_InstrumentData.h5',where=query)
-            result_dates = DatetimeIndex(result.index.get_level_values(0), dtype='datetime64[ns, UTC]')
-            result = result[~result.index.get_level_values(0).isin(result_dates.difference(self.sessions))]
-            out.append(result.as_matrix(columns))
-        debug_session = self.trading_calendar.sessions_in_range(start_date,end_date)
-        if len(debug_session.difference(result_dates)) > 0:
-            print(debug_session.difference(result_dates))
-            print(exchange_symbols)
+        groups = self._group_by_partition(exchange_symbols)
+        if len(groups) == 1:
+            key, (_, symbols) = groups.popitem()
+            return self._load_partition(key, columns, start_date, end_date, symbols)
+
+        sessions = self.trading_calendar.sessions_in_range(start_date, end_date)
+        shape = len(sessions), len(exchange_symbols)
+        out = [_make_bar_out(column, shape) for column in columns]
+        for key, (positions, symbols) in groups.items():
+            arrays = self._load_partition(key, columns, start_date, end_date, symbols)
+            for array, result in zip(out, arrays):
+                array[:, positions] = result
+        return out
+
+    def _load_partition(self, key, columns, start_date, end_date, exchange_symbols):
+        partition = self._partitions[key]
+        sessions = self.trading_calendar.sessions_in_range(start_date, end_date)
+        if self._in_memory:
+            return partition.columnar.load_raw_arrays(columns, sessions.asi8, exchange_symbols)
+
+        unique_symbols = list(dict.fromkeys(exchange_symbols))
+        if len(unique_symbols) > min(self._read_all_threshold, len(sessions)):
+            # One query over the date range for all symbols; the rows of the
+            # symbols which were not requested are dropped when scattering.
+            # This is also used when there are more symbols than sessions,
+            # e.g. the spot values of many instruments on one session, as a
+            # query per symbol would then cost more than reading the range.
+            result = partition.query(start_date, end_date)
+        elif unique_symbols:
+            result = pd.concat([
+                partition.query(start_date, end_date, exchange_symbol)
+                for exchange_symbol in unique_symbols
+            ])
+        else:
+            result = None
+        return self._scatter(result, columns, sessions, exchange_symbols)
+
+    @staticmethod
+    def _scatter(result, columns, sessions, exchange_symbols):
+        """
+        Place the rows of a (date, exchange_symbol) indexed query result into
+        arrays of shape (len(sessions), len(exchange_symbols)), one per
+        column. Rows for dates which are not sessions, or for symbols which
+        were not requested, are dropped.
+        """
+        shape = len(sessions), len(exchange_symbols)
+        out = [_make_bar_out(column, shape) for column in columns]
+        if result is None or result.empty or not len(sessions):
+            return out
+
+        unique_symbols = pd.Index(exchange_symbols).unique()
+        if len(unique_symbols) != len(exchange_symbols):
+            shape = len(sessions), len(unique_symbols)
+            unique_out = [_make_bar_out(column, shape) for column in columns]
+        else:
+            unique_out = out
+
+        sessions_ns = sessions.asi8
+        dates = result.index.get_level_values(0).values.astype('datetime64[ns]').view(np.int64)
+        row_ix = sessions_ns.searchsorted(dates)
+        col_ix = unique_symbols.get_indexer(result.index.get_level_values(1))
+
+        mask = (row_ix < len(sessions_ns)) & (col_ix >= 0)
+        mask[mask] = sessions_ns[row_ix[mask]] == dates[mask]
+        row_ix = row_ix[mask]
+        col_ix = col_ix[mask]
+
+        for column, array in zip(columns, unique_out):
+            array[row_ix, col_ix] = result[column].values[mask]
+
+        if unique_out is not out:
+            take = unique_symbols.get_indexer(exchange_symbols)
+            out = [array[:, take] for array in unique_out]
         return out
 
     def get_value(self, exchange_symbol, dt, field):
         """
         Parameters
         ----------
-        exchange_symbol : Exchange Symbol
-            The exchange_symbol to get.
+        exchange_symbol : Instrument or str
+            The instrument to get. Exchange symbols passed as str are read
+            from InstrumentData.h5.
         day : datetime64-like
             Midnight of the day for which data is requested.
         colname : string
@@ -144,11 +583,60 @@ class HdfDailyBarReader(SessionBarReader):
             Returns -1 if the day is within the date range, but the price is
             0.
         """
-#        exchange_symbol = instrument.exchange_symbol
-#        print(exchange_symbol)
-        query = "date=" + dt.strftime("%Y%m%d") + "& exchange_symbol=" + "\"" + exchange_symbol + "\""
-        results = read_hdf(dirname +'\..\database\_InstrumentData.h5',where=query)
+        key = self._partition_key(exchange_symbol)
+        if type(exchange_symbol) is not str:
+            exchange_symbol = exchange_symbol.exchange_symbol
+        partition = self._partitions[key]
+        if self._in_memory:
+            row = self._session_index(key).row(exchange_symbol, pd.Timestamp(dt).value)
+            if row < 0:
+                raise NoDataOnDate("day={0} is outside of calendar={1}".format(
+                    dt, self.trading_calendar.sessions_in_range(self._start_session, self._end_session)))
+            return partition.columnar.columns[field][row]
+        results = partition.query(dt, dt, exchange_symbol)
         if results.shape[0] == 0:
             raise NoDataOnDate("day={0} is outside of calendar={1}".format(
                 dt, self.trading_calendar.sessions_in_range(self._start_session, self._end_session)))
         return results.iloc[0][field]
+
+    def get_values(self, exchange_symbols, dts, field):
+        """
+        Vectorized ``get_value`` over many (exchange_symbol, dt) pairs.
+        Parameters
+        ----------
+        exchange_symbols : list of str or Instrument
+            The exchange_symbols to get.
+        dts : pd.Timestamp or iterable of datetime64-like
+            The sessions for which data is requested, either one per
+            exchange_symbol or a single session for all of them.
+        field : string
+            The price field. e.g. ('open', 'high', 'low', 'close', 'volume', 'open_interest')
+        Returns
+        -------
+        np.ndarray[float64]
+            The value of ``field`` for each pair. Pairs with no data are nan.
+        """
+        if isinstance(dts, pd.Timestamp):
+            dts_ns = dts.value
+        else:
+            dts_ns = pd.DatetimeIndex(dts).values.astype('datetime64[ns]').view(np.int64)
+
+        if self._in_memory:
+            dts_ns = np.broadcast_to(dts_ns, (len(exchange_symbols),))
+            out = np.full(len(exchange_symbols), np.nan)
+            for key, (positions, symbols) in self._group_by_partition(exchange_symbols).items():
+                rows = self._session_index(key).rows(symbols, dts_ns[positions])
+                found = rows >= 0
+                values = np.full(len(rows), np.nan)
+                values[found] = self._partitions[key].columnar.columns[field][rows[found]]
+                out[positions] = values
+            return out
+
+        dts_ns = np.broadcast_to(dts_ns, (len(exchange_symbols),))
+        out = np.full(len(exchange_symbols), np.nan)
+        for i, (exchange_symbol, dt_ns) in enumerate(zip(exchange_symbols, dts_ns)):
+            try:
+                out[i] = self.get_value(exchange_symbol, pd.Timestamp(dt_ns, tz='UTC'), field)
+            except NoDataOnDate:
+                pass
+        return out
@@ -3,13 +3,15 @@ from abc import (
     abstractmethod,
     abstractproperty,
 )
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 
-from numpy import concatenate
+from numpy import concatenate, stack
 from lru import LRU
 from pandas import isnull
-from toolz import sliding_window
+from toolz import concat, sliding_window, unique
 
-from six import with_metaclass
+from six import iteritems, with_metaclass
 
 from shogun.lib.adjustment import Float64Multiply, Float64Add
 
@@ -279,14 +281,17 @@ class SlidingWindow(object):
        simulation dt.
     cal_start : int
        Index in the overall calendar at which the window starts.
+    prefetch_end_ix : int, optional
+       Index in the overall calendar of the last dt the window can provide.
     """
 
-    def __init__(self, window, size, cal_start, offset):
+    def __init__(self, window, size, cal_start, offset, prefetch_end_ix=None):
         self.window = window
         self.cal_start = cal_start
         self.current = next(window)
         self.offset = offset
         self.most_recent_ix = self.cal_start + size
+        self.prefetch_end_ix = prefetch_end_ix
 
     def get(self, end_ix):
         """
@@ -315,6 +320,15 @@ class HistoryLoader(with_metaclass(ABCMeta)):
         Reader for pricing bars.
     adjustment_reader : SQLiteAdjustmentReader
         Reader for adjustment data.
+    prefetch_length : int, optional
+        The number of dts past the requested end which are loaded into each
+        window block.
+    prefetch_threshold : int, optional
+        When a window block can serve at most this many more dts, the next
+        block for the same (instrument, size, field) is loaded on a worker
+        thread. If None, blocks are only loaded when they are requested.
+        Blocks are only prefetched if ``reader`` is ``thread_safe``, since
+        the worker reads it while the caller may be using it too.
     """
     FIELDS = ('open', 'high', 'low', 'close', 'volume', 'open_interest', 'exchange_symbol')
 
@@ -322,7 +336,8 @@ class HistoryLoader(with_metaclass(ABCMeta)):
                  instrument_finder,
                  roll_finders,
                  exchange_symbol_cache_size=1000,
-                 prefetch_length=0):
+                 prefetch_length=0,
+                 prefetch_threshold=None):
         self.trading_calendar = trading_calendar
         self._instrument_finder = instrument_finder
         self._reader = reader
@@ -343,6 +358,32 @@ class HistoryLoader(with_metaclass(ABCMeta)):
             for field in self.FIELDS
         }
         self._prefetch_length = prefetch_length
+        if getattr(reader, 'thread_safe', False):
+            self._prefetch_threshold = prefetch_threshold
+        else:
+            self._prefetch_threshold = None
+        # Map from (field, instrument, size, is_perspective_after) ->
+        # (future, position in the future's result, first end index served)
+        # of the window blocks being loaded in the background.
+        self._prefetched = {}
+        # Window blocks are built by at most one thread at a time, so readers
+        # are never used concurrently by the loader.
+        self._reader_lock = Lock()
+        self._executor = None
+
+    def _prefetch_executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1)
+        return self._executor
+
+    def close(self):
+        """
+        Wait for the blocks being prefetched and stop the prefetch worker.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._prefetched.clear()
 
     @abstractproperty
     def _frequency(self):
@@ -353,7 +394,11 @@ class HistoryLoader(with_metaclass(ABCMeta)):
         pass
 
     @abstractmethod
-    def _array(self, start, end, instruments, field):
+    def _arrays(self, dts, instruments, fields):
+        """
+        Returns a list with an array of shape (len(dts), len(instruments))
+        per field in ``fields``, read from the reader in one pass.
+        """
         pass
 
     def _decimal_places_for_instrument(self, instrument, reference_date):
@@ -399,33 +444,96 @@ class HistoryLoader(with_metaclass(ABCMeta)):
         window can provide `get` for the index corresponding with the last
         value in `dts`
         """
+        return self._ensure_panel_windows(instruments, dts, [field],
+                                          is_perspective_after)[field]
+
+    def _ensure_panel_windows(self, instruments, dts, fields,
+                              is_perspective_after):
+        """
+        Ensure that there is a window for each (field, instrument) pair, as
+        ``_ensure_sliding_windows`` does for a single field. The windows
+        which are missing or expired are loaded together, with one read of
+        the reader for all of their fields.
+        Returns
+        -------
+        out : dict[str -> list of Float64Window]
+            The windows of each field, in the order of ``instruments``.
+        """
         end = dts[-1]
         size = len(dts)
-        instrument_windows = {}
-        needed_instruments = []
+        field_windows = {field: {} for field in fields}
+        needed = {}
         cal = self._calendar
 
-        #instruments = self._instrument_finder.retrieve_all(instruments)
         end_ix = find_in_sorted_index(cal, end)
 
-        for instrument in instruments:
-            try:
-                window = self._window_blocks[field].get(
-                    (instrument, size, is_perspective_after), end)
-            except KeyError:
-                needed_instruments.append(instrument)
-            else:
-                if end_ix < window.most_recent_ix:
-                    # Window needs reset. Requested end index occurs before the
-                    # end index from the previous history call for this window.
-                    # Grab new window instead of rewinding adjustments.
-                    needed_instruments.append(instrument)
+        for field in fields:
+            instrument_windows = field_windows[field]
+            for instrument in instruments:
+                try:
+                    window = self._window_blocks[field].get(
+                        (instrument, size, is_perspective_after), end)
+                except KeyError:
+                    window = self._take_prefetched(
+                        instrument, size, field, is_perspective_after, end_ix)
+                    if window is None:
+                        needed.setdefault(field, []).append(instrument)
+                    else:
+                        instrument_windows[instrument] = window
                 else:
-                    instrument_windows[instrument] = window
+                    if end_ix < window.most_recent_ix:
+                        # Window needs reset. Requested end index occurs before
+                        # the end index from the previous history call for this
+                        # window. Grab new window instead of rewinding
+                        # adjustments.
+                        needed.setdefault(field, []).append(instrument)
+                    else:
+                        instrument_windows[instrument] = window
+
+        if needed:
+            needed_fields = [field for field in fields if field in needed]
+            needed_instruments = list(
+                unique(concat(needed[field] for field in needed_fields)))
+            start_ix = find_in_sorted_index(cal, dts[0])
+            windows, prefetch_end = self._make_panel_windows(
+                needed_instruments, start_ix, end_ix, size, needed_fields,
+                is_perspective_after)
+            for field in needed_fields:
+                loaded = dict(zip(needed_instruments, windows[field]))
+                for instrument in needed[field]:
+                    sliding_window = loaded[instrument]
+                    field_windows[field][instrument] = sliding_window
+                    self._window_blocks[field].set(
+                        (instrument, size, is_perspective_after),
+                        sliding_window,
+                        prefetch_end)
+
+        if self._prefetch_threshold is not None:
+            self._prefetch_next_blocks(field_windows, end_ix, size,
+                                       is_perspective_after)
+
+        return {
+            field: [field_windows[field][instrument]
+                    for instrument in instruments]
+            for field in fields
+        }
 
-        if needed_instruments:
+    def _make_panel_windows(self, instruments, start_ix, end_ix, size, fields,
+                            is_perspective_after):
+        """
+        Load a block of data for ``instruments`` and every field in
+        ``fields`` with one read of the reader, and wrap it in a
+        SlidingWindow per (field, instrument) pair.
+        Returns
+        -------
+        windows : dict[str -> list of SlidingWindow]
+            The window of each instrument, by field.
+        prefetch_end : pd.Timestamp
+            The last dt the windows can provide.
+        """
+        with self._reader_lock:
+            cal = self._calendar
             offset = 0
-            start_ix = find_in_sorted_index(cal, dts[0])
 
             prefetch_end_ix = min(end_ix + self._prefetch_length, len(cal) - 1)
             prefetch_end = cal[prefetch_end_ix]
@@ -436,45 +544,109 @@ class HistoryLoader(with_metaclass(ABCMeta)):
             else:
                 adj_dts = prefetch_dts
             prefetch_len = len(prefetch_dts)
-            array = self._array(prefetch_dts, needed_instruments, field)
+            arrays = self._arrays(prefetch_dts, instruments, fields)
 
-            if field == 'exchange_symbol':
-                window_type = Int64Window
-            else:
-                window_type = Float64Window
+            adj_readers = [self._adjustment_readers.get(type(instrument))
+                           for instrument in instruments]
+            decimal_places = [
+                self._decimal_places_for_instrument(instrument, cal[end_ix])
+                for instrument in instruments
+            ]
 
             view_kwargs = {}
-            if field == 'volume' or field == 'open_interest':
-                array = array.astype(float64_dtype)
-
-            for i, instrument in enumerate(needed_instruments):
-                adj_reader = None
-                try:
-                    adj_reader = self._adjustment_readers[type(instrument)]
-                except KeyError:
-                    adj_reader = None
-                if adj_reader is not None:
-                    adjs = adj_reader.load_adjustments(
-                        [field], adj_dts, [instrument])[0]
+            windows = {}
+            for field, array in zip(fields, arrays):
+                if field == 'exchange_symbol':
+                    window_type = Int64Window
                 else:
-                    adjs = {}
-                window = window_type(
-                    array[:, i].reshape(prefetch_len, 1),
-                    view_kwargs,
-                    adjs,
-                    offset,
-                    size,
-                    int(is_perspective_after),
-                    self._decimal_places_for_instrument(instrument, dts[-1]),
-                )
-                sliding_window = SlidingWindow(window, size, start_ix, offset)
-                instrument_windows[instrument] = sliding_window
-                self._window_blocks[field].set(
-                    (instrument, size, is_perspective_after),
-                    sliding_window,
-                    prefetch_end)
-
-        return [instrument_windows[instrument] for instrument in instruments]
+                    window_type = Float64Window
+
+                if field == 'volume' or field == 'open_interest':
+                    array = array.astype(float64_dtype)
+
+                field_windows = windows[field] = []
+                for i, instrument in enumerate(instruments):
+                    adj_reader = adj_readers[i]
+                    if adj_reader is not None:
+                        adjs = adj_reader.load_adjustments(
+                            [field], adj_dts, [instrument])[0]
+                    else:
+                        adjs = {}
+                    window = window_type(
+                        array[:, i].reshape(prefetch_len, 1),
+                        view_kwargs,
+                        adjs,
+                        offset,
+                        size,
+                        int(is_perspective_after),
+                        decimal_places[i],
+                    )
+                    field_windows.append(SlidingWindow(window, size, start_ix,
+                                                       offset, prefetch_end_ix))
+            return windows, prefetch_end
+
+    def _prefetch_next_blocks(self, field_windows, end_ix, size,
+                              is_perspective_after):
+        """
+        Start loading, on the prefetch worker, the block which follows each
+        window that can serve at most ``prefetch_threshold`` more dts. The
+        windows of every field which are due together are loaded with one
+        read of the reader.
+        """
+        last_ix = len(self._calendar) - 1
+        due = {}
+        for field, instrument_windows in iteritems(field_windows):
+            for instrument, window in iteritems(instrument_windows):
+                block_end_ix = window.prefetch_end_ix
+                if block_end_ix is None or block_end_ix >= last_ix or \
+                        block_end_ix - end_ix > self._prefetch_threshold:
+                    continue
+                if (field, instrument, size, is_perspective_after) in \
+                        self._prefetched:
+                    continue
+                # Windows which were loaded together are prefetched together.
+                due.setdefault(block_end_ix, []).append((field, instrument))
+
+        for block_end_ix, pairs in iteritems(due):
+            next_end_ix = block_end_ix + 1
+            next_start_ix = next_end_ix - size + 1
+            if next_start_ix < 0:
+                continue
+            fields = list(unique(field for field, _ in pairs))
+            instruments = list(unique(instrument for _, instrument in pairs))
+            positions = {instrument: i for i, instrument in enumerate(instruments)}
+            future = self._prefetch_executor().submit(
+                self._make_panel_windows, instruments, next_start_ix,
+                next_end_ix, size, fields, is_perspective_after)
+            for field, instrument in pairs:
+                self._prefetched[(field, instrument, size, is_perspective_after)] = \
+                    (future, positions[instrument], next_end_ix)
+
+    def _take_prefetched(self, instrument, size, field, is_perspective_after,
+                         end_ix):
+        """
+        Returns the prefetched window of ``instrument`` if it can serve a
+        window ending at ``end_ix``, otherwise None. The window is cached as
+        if it had been loaded synchronously.
+        """
+        try:
+            future, i, first_end_ix = self._prefetched.pop(
+                (field, instrument, size, is_perspective_after))
+        except KeyError:
+            return None
+        try:
+            windows, prefetch_end = future.result()
+        except Exception:
+            # Let the synchronous load surface the error.
+            return None
+        window = windows[field][i]
+        if not first_end_ix <= end_ix <= window.prefetch_end_ix:
+            return None
+        self._window_blocks[field].set(
+            (instrument, size, is_perspective_after),
+            window,
+            prefetch_end)
+        return window
 
     def history(self, instruments, dts, field, is_perspective_after):
         """
@@ -548,6 +720,39 @@ class HistoryLoader(with_metaclass(ABCMeta)):
             axis=1,
         )
 
+    def history_panel(self, instruments, dts, fields, is_perspective_after):
+        """
+        Windows of pricing data for several fields, as ``history`` returns
+        for one. The blocks of the fields which are not cached are loaded
+        with one read of the reader for all of them.
+        Parameters
+        ----------
+        instruments : iterable of Instruments
+            The instruments in the window.
+        dts : iterable of datetime64-like
+            The datetimes for which to fetch data.
+            Makes an assumption that all dts are present and contiguous,
+            in the calendar.
+        fields : list of str
+            The OHLCV fields for which to retrieve data.
+        is_perspective_after : bool
+            see: `PricingHistoryLoader.history`
+        Returns
+        -------
+        out : np.ndarray with shape(len(fields), len(dts), len(instruments))
+        """
+        blocks = self._ensure_panel_windows(instruments,
+                                            dts,
+                                            fields,
+                                            is_perspective_after)
+        end_ix = self._calendar.searchsorted(dts[-1])
+
+        return stack([
+            concatenate([window.get(end_ix) for window in blocks[field]],
+                        axis=1)
+            for field in fields
+        ])
+
 
 class DailyHistoryLoader(HistoryLoader):
 
@@ -559,10 +764,32 @@ class DailyHistoryLoader(HistoryLoader):
     def _calendar(self):
         return self._reader.sessions
 
-    def _array(self, dts, instruments, field):
+    def _arrays(self, dts, instruments, fields):
         return self._reader.load_raw_arrays(
-            [field],
+            fields,
             dts[0],
             dts[-1],
             instruments,
-        )[0]
+        )
+
+
+class MinuteHistoryLoader(HistoryLoader):
+
+    @property
+    def _frequency(self):
+        return 'minute'
+
+    @lazyval
+    def _calendar(self):
+        mm = self.trading_calendar.all_minutes
+        start = mm.searchsorted(self._reader.first_trading_day)
+        end = mm.searchsorted(self._reader.last_available_dt, side='right')
+        return mm[start:end]
+
+    def _arrays(self, dts, instruments, fields):
+        return self._reader.load_raw_arrays(
+            fields,
+            dts[0],
+            dts[-1],
+            instruments,
+        )
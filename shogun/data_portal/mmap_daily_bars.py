@@ -0,0 +1,298 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from pandas import read_hdf
+
+from shogun.utils.memoize import lazyval
+from shogun.utils.calendar_registry import get_calendar_registry
+from shogun.data_portal.session_bars import SessionBarReader
+from shogun.data_portal.bar_reader import NoDataOnDate
+from shogun.data_portal.hdf_daily_bars import BAR_COLUMNS, _make_bar_out
+
+dirname = os.path.dirname(__file__)
+
+METADATA_FILENAME = 'metadata.json'
+FORMAT_VERSION = 1
+
+
+def _column_path(rootdir, column):
+    return os.path.join(rootdir, column + '.bin')
+
+
+class MmapDailyBarWriter(object):
+    """
+    Writes daily bars into a directory of flat, fixed-dtype files which can
+    be memory-mapped by ``MmapDailyBarReader``.
+    Parameters
+    ----------
+    rootdir : str
+        The directory in which to write the bar files.
+    calendar : TradingCalendar
+        The calendar used to lay out the rows of each exchange_symbol.
+    start_session : pd.Timestamp
+        The first session of the dataset.
+    end_session : pd.Timestamp
+        The last session of the dataset.
+    Notes
+    -----
+    Each field in ``BAR_COLUMNS`` is stored as a flat file of little-endian
+    float64 values. The rows of each exchange_symbol are contiguous and
+    contain one row per calendar session from the symbol's first to its last
+    bar; sessions without a bar are written as nan (0 for volume and
+    open_interest). The row of a (symbol, session) pair is therefore
+    ``first_row[symbol] + session_index - calendar_offset[symbol]``.
+    """
+    def __init__(self, rootdir, calendar, start_session, end_session):
+        self._rootdir = rootdir
+        self._calendar = calendar
+        self._start_session = start_session
+        self._end_session = end_session
+
+    def write_from_hdf(self, paths=None):
+        """
+        Convert the hdf pricing tables into this format.
+        Parameters
+        ----------
+        paths : iterable of str, optional
+            The hdf files to convert. Defaults to _InstrumentData.h5 and
+            _OptionData.h5.
+        """
+        if paths is None:
+            paths = (
+                dirname + '\..\database\_InstrumentData.h5',
+                dirname + '\..\database\_OptionData.h5',
+            )
+        return self.write(pd.concat([read_hdf(path) for path in paths]))
+
+    def write(self, df):
+        """
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Bars indexed by ('date', 'exchange_symbol') with the columns
+            listed in ``BAR_COLUMNS``.
+        """
+        sessions = self._calendar.sessions_in_range(self._start_session,
+                                                    self._end_session)
+        sessions_ns = sessions.asi8
+
+        df = df.reset_index()
+        df = df[~df.duplicated(['exchange_symbol', 'date'], keep='last')]
+        df = df.sort_values(['exchange_symbol', 'date'], kind='mergesort')
+
+        dates = df['date'].values.astype('datetime64[ns]').view(np.int64)
+        session_ix = sessions_ns.searchsorted(dates)
+        on_session = session_ix < len(sessions_ns)
+        on_session[on_session] = sessions_ns[session_ix[on_session]] == \
+            dates[on_session]
+        df = df[on_session]
+        session_ix = session_ix[on_session]
+
+        symbols = df['exchange_symbol'].values
+        if len(symbols):
+            starts = np.flatnonzero(
+                np.concatenate([[True], symbols[1:] != symbols[:-1]]))
+            ends = np.append(starts[1:], len(symbols)) - 1
+        else:
+            # No bar falls on a session of the calendar.
+            starts = ends = np.array([], dtype=np.int64)
+
+        calendar_offset = session_ix[starts]
+        spans = session_ix[ends] - calendar_offset + 1
+        first_row = np.concatenate([[0], np.cumsum(spans)[:-1]]).astype(
+            np.int64) if len(spans) else spans
+        last_row = first_row + spans - 1
+        num_rows = int(spans.sum())
+
+        # Row of each bar in the dense layout.
+        block = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(symbols))))
+        rows = first_row[block] + session_ix - calendar_offset[block]
+
+        if not os.path.isdir(self._rootdir):
+            os.makedirs(self._rootdir)
+
+        for column in BAR_COLUMNS:
+            out = _make_bar_out(column, num_rows)
+            out[rows] = df[column].values
+            out.astype('<f8').tofile(_column_path(self._rootdir, column))
+
+        unique_symbols = [str(s) for s in symbols[starts]]
+        metadata = {
+            'version': FORMAT_VERSION,
+            'columns': list(BAR_COLUMNS),
+            'first_row': dict(zip(unique_symbols, first_row.tolist())),
+            'last_row': dict(zip(unique_symbols, last_row.tolist())),
+            'calendar_offset': dict(zip(unique_symbols, calendar_offset.tolist())),
+            'start_session_ns': int(sessions_ns[0]),
+            'end_session_ns': int(sessions_ns[-1]),
+            'calendar_name': self._calendar.name,
+        }
+        with open(os.path.join(self._rootdir, METADATA_FILENAME), 'w') as f:
+            json.dump(metadata, f)
+        return metadata
+
+
+class MmapDailyBarReader(SessionBarReader):
+    """
+    Reader for daily bars written by ``MmapDailyBarWriter``.
+    Opening the reader only parses the metadata; the field files are
+    memory-mapped on first use, so several processes reading the same
+    directory share the OS page cache.
+    Parameters
+    ----------
+    rootdir : str
+        The directory containing the bar files.
+    calendar : TradingCalendar, optional
+        The calendar used to write the bars. Defaults to the calendar named
+        in the metadata.
+    Attributes
+    ----------
+    first_row : dict
+        Map from exchange_symbol -> index of first row with that symbol.
+    last_row : dict
+        Map from exchange_symbol -> index of last row with that symbol.
+    calendar_offset : dict
+        Map from exchange_symbol -> calendar index of first row.
+    """
+    # Reads only slice read-only memory maps.
+    thread_safe = True
+
+    def __init__(self, rootdir, calendar=None):
+        self._rootdir = rootdir
+        with open(os.path.join(rootdir, METADATA_FILENAME)) as f:
+            metadata = json.load(f)
+
+        self.first_row = metadata['first_row']
+        self.last_row = metadata['last_row']
+        self.calendar_offset = metadata['calendar_offset']
+        self._start_session = pd.Timestamp(metadata['start_session_ns'], tz='UTC')
+        self._end_session = pd.Timestamp(metadata['end_session_ns'], tz='UTC')
+
+        if calendar is None:
+            calendar = get_calendar_registry().get_calendar(
+                metadata['calendar_name'])
+        self.calendar = calendar
+        self._columns = {}
+
+    def _column(self, column):
+        try:
+            return self._columns[column]
+        except KeyError:
+            path = _column_path(self._rootdir, column)
+            if os.path.getsize(path):
+                array = np.memmap(path, dtype='<f8', mode='r')
+            else:
+                array = np.empty(0, dtype='<f8')
+            self._columns[column] = array
+            return array
+
+    @property
+    def trading_calendar(self):
+        return self.calendar
+
+    @lazyval
+    def sessions(self):
+        return self.trading_calendar.sessions_in_range(self._start_session,
+                                                       self._end_session)
+
+    @lazyval
+    def first_trading_day(self):
+        return self._start_session
+
+    @property
+    def last_available_dt(self):
+        return self._end_session
+
+    def _span(self, exchange_symbol, start_ix, end_ix):
+        """
+        Returns the overlap of [start_ix, end_ix] with the session indices
+        covered by ``exchange_symbol`` as (first_session_ix, first_row,
+        num_rows), or None if there is no overlap.
+        """
+        try:
+            first = self.first_row[exchange_symbol]
+            last = self.last_row[exchange_symbol]
+            offset = self.calendar_offset[exchange_symbol]
+        except KeyError:
+            return None
+        lo = max(start_ix, offset)
+        hi = min(end_ix, offset + last - first)
+        if lo > hi:
+            return None
+        return lo, first + lo - offset, hi - lo + 1
+
+    def load_raw_arrays(self, columns, start_date, end_date, exchange_symbols):
+        exchange_symbols = [t.exchange_symbol if type(t) is not str else t for t in exchange_symbols]
+        sessions = self.sessions
+        start_ix = sessions.searchsorted(start_date)
+        end_ix = sessions.searchsorted(end_date, side='right') - 1
+
+        requested = self.trading_calendar.sessions_in_range(start_date, end_date)
+        shape = len(requested), len(exchange_symbols)
+        out = [_make_bar_out(column, shape) for column in columns]
+        if start_ix > end_ix:
+            return out
+
+        # The requested range may start before the first session of the
+        # reader, so rows are placed by their position in the requested
+        # sessions rather than in the reader's.
+        row_offset = requested.searchsorted(sessions[start_ix]) - start_ix
+
+        for j, exchange_symbol in enumerate(exchange_symbols):
+            span = self._span(exchange_symbol, start_ix, end_ix)
+            if span is None:
+                continue
+            session_ix, row, length = span
+            out_ix = session_ix + row_offset
+            for column, array in zip(columns, out):
+                array[out_ix:out_ix + length, j] = \
+                    self._column(column)[row:row + length]
+        return out
+
+    def _row(self, exchange_symbol, dt):
+        session_ix = self.sessions.searchsorted(dt)
+        if session_ix == len(self.sessions) or self.sessions[session_ix] != dt:
+            raise NoDataOnDate("day={0} is outside of calendar={1}".format(
+                dt, self.sessions))
+        span = self._span(exchange_symbol, session_ix, session_ix)
+        if span is None:
+            raise NoDataOnDate("day={0} is outside of the range of {1}".format(
+                dt, exchange_symbol))
+        return span[1]
+
+    def get_value(self, exchange_symbol, dt, field):
+        """
+        Parameters
+        ----------
+        exchange_symbol : Exchange Symbol
+            The exchange_symbol to get.
+        day : datetime64-like
+            Midnight of the day for which data is requested.
+        colname : string
+            The price field. e.g. ('open', 'high', 'low', 'close', 'volume', 'open_interest')
+        Returns
+        -------
+        float
+            The spot price for colname of the given exchange_symbol on the given day.
+            Raises a NoDataOnDate exception if the given day and exchange_symbol is before
+            or after the date range of the instrument.
+        """
+        if type(exchange_symbol) is not str:
+            exchange_symbol = exchange_symbol.exchange_symbol
+        return self._column(field)[self._row(exchange_symbol, dt)]
+
+    def get_last_traded_dt(self, instrument, dt):
+        exchange_symbol = instrument if type(instrument) is str else instrument.exchange_symbol
+        end_ix = self.sessions.searchsorted(dt, side='right') - 1
+        span = self._span(exchange_symbol, 0, end_ix)
+        if span is None:
+            return pd.NaT
+        session_ix, row, length = span
+        close = self._column('close')[row:row + length]
+        volume = self._column('volume')[row:row + length]
+        traded = np.flatnonzero(~np.isnan(close) & (volume != 0))
+        if not len(traded):
+            return pd.NaT
+        return self.sessions[session_ix + traded[-1]]
@@ -0,0 +1,381 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from shogun.utils.memoize import lazyval
+from shogun.utils.calendar_registry import (
+    CalendarArrays,
+    get_calendar_registry,
+)
+from shogun.data_portal.minute_bars import MinuteBarReader
+from shogun.data_portal.bar_reader import NoDataOnDate
+from shogun.data_portal.hdf_daily_bars import BAR_COLUMNS, _make_bar_out
+from shogun.data_portal.mmap_daily_bars import _column_path
+
+METADATA_FILENAME = 'metadata.json'
+INDEX_FILENAME = 'index.bin'
+FORMAT_VERSION = 1
+
+NANOS_IN_MINUTE = 60 * 10 ** 9
+
+
+class _SessionLayout(object):
+    """
+    The market minutes of the sessions from ``start_session`` to
+    ``end_session`` of a calendar, numbered consecutively across sessions.
+    Attributes
+    ----------
+    sessions : np.ndarray[int64]
+        The session labels, as nanoseconds.
+    opens : np.ndarray[int64]
+        The first minute of each session, as nanoseconds.
+    minute_counts : np.ndarray[int64]
+        The number of minutes of each session, from its open through its
+        close.
+    minute_offsets : np.ndarray[int64]
+        The number of the first minute of each session.
+    """
+    def __init__(self, calendar, start_session, end_session):
+        arrays = CalendarArrays(calendar)
+        lo = arrays.sessions.searchsorted(pd.Timestamp(start_session).value)
+        hi = arrays.sessions.searchsorted(pd.Timestamp(end_session).value,
+                                          side='right')
+        self.sessions = arrays.sessions[lo:hi]
+        self.opens = arrays.opens[lo:hi]
+        self.closes = arrays.closes[lo:hi]
+        self.minute_counts = (self.closes - self.opens) // NANOS_IN_MINUTE + 1
+        self.minute_offsets = np.concatenate(
+            [[0], np.cumsum(self.minute_counts)[:-1]]).astype(np.int64)
+
+    def locate(self, minutes):
+        """
+        Returns the session index and the minute of the session of each of
+        ``minutes``, given as nanoseconds. The session index is -1 for the
+        minutes which are not market minutes.
+        """
+        session_ix = self.closes.searchsorted(minutes)
+        valid = session_ix < len(self.closes)
+        session_ix[~valid] = 0
+        delta = minutes - self.opens[session_ix]
+        valid &= (delta >= 0) & (delta % NANOS_IN_MINUTE == 0)
+        session_ix[~valid] = -1
+        return session_ix, delta // NANOS_IN_MINUTE
+
+    def last_minute_at_or_before(self, minute):
+        """
+        Returns the session index and the minute of the session of the last
+        market minute at or before ``minute``, or (-1, -1) if there is none.
+        """
+        session_ix = self.opens.searchsorted(minute, side='right') - 1
+        if session_ix < 0:
+            return -1, -1
+        minute_ix = min((minute - self.opens[session_ix]) // NANOS_IN_MINUTE,
+                        self.minute_counts[session_ix] - 1)
+        return session_ix, minute_ix
+
+    def minute_range(self, start_dt, end_dt):
+        """
+        Returns the numbers of the first and the last market minutes between
+        ``start_dt`` and ``end_dt``, both inclusive. The range is empty if
+        the first is after the last.
+        """
+        start = pd.Timestamp(start_dt).value
+        first_session = self.closes.searchsorted(start)
+        if first_session == len(self.closes):
+            return 0, -1
+        first = self.minute_offsets[first_session] + max(
+            0, -((self.opens[first_session] - start) // NANOS_IN_MINUTE))
+
+        last_session, last_minute = self.last_minute_at_or_before(
+            pd.Timestamp(end_dt).value)
+        if last_session < 0:
+            return 0, -1
+        return first, self.minute_offsets[last_session] + last_minute
+
+    def minute(self, session_ix, minute_ix):
+        return pd.Timestamp(
+            self.opens[session_ix] + minute_ix * NANOS_IN_MINUTE, tz='UTC')
+
+
+class MmapMinuteBarWriter(object):
+    """
+    Writes minute bars into a directory of flat, fixed-dtype files which can
+    be memory-mapped by ``MmapMinuteBarReader``.
+    Parameters
+    ----------
+    rootdir : str
+        The directory in which to write the bar files.
+    calendar : TradingCalendar
+        The calendar used to lay out the minutes of each session.
+    start_session : pd.Timestamp
+        The first session of the dataset.
+    end_session : pd.Timestamp
+        The last session of the dataset.
+    Notes
+    -----
+    The bars are stored in blocks of one session of one exchange_symbol,
+    holding a row per market minute of the session from its open through
+    its close; minutes without a bar are written as nan (0 for volume and
+    open_interest). Only the sessions in which a symbol has bars get a
+    block, so a contract takes space for the sessions it traded rather than
+    for the whole calendar. The blocks of each field are concatenated into
+    a flat file of little-endian float64 values, and ``index.bin`` holds the
+    first row of the block of each (symbol, session) pair, or -1, as a
+    (symbols, sessions) int64 array.
+    """
+    def __init__(self, rootdir, calendar, start_session, end_session):
+        self._rootdir = rootdir
+        self._calendar = calendar
+        self._start_session = start_session
+        self._end_session = end_session
+
+    def write(self, df):
+        """
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Bars indexed by ('date', 'exchange_symbol'), where date is the
+            minute of the bar, with the columns listed in ``BAR_COLUMNS``.
+            Bars which do not fall on a market minute are dropped.
+        """
+        layout = _SessionLayout(self._calendar,
+                                self._start_session,
+                                self._end_session)
+        num_sessions = len(layout.sessions)
+
+        df = df.reset_index()
+        df = df[~df.duplicated(['exchange_symbol', 'date'], keep='last')]
+
+        dates = df['date'].values.astype('datetime64[ns]').view(np.int64)
+        session_ix, minute_ix = layout.locate(dates)
+        on_session = session_ix >= 0
+        df = df[on_session]
+        session_ix = session_ix[on_session]
+        minute_ix = minute_ix[on_session]
+
+        symbols, symbol_ix = np.unique(
+            df['exchange_symbol'].values.astype(str), return_inverse=True)
+
+        # Blocks are ordered by symbol then session, so the blocks of a
+        # symbol are contiguous and in time order.
+        blocks, block_of_bar = np.unique(
+            symbol_ix.astype(np.int64) * num_sessions + session_ix,
+            return_inverse=True)
+        block_sizes = layout.minute_counts[blocks % num_sessions]
+        block_starts = np.concatenate(
+            [[0], np.cumsum(block_sizes)[:-1]]).astype(np.int64)
+        rows = block_starts[block_of_bar] + minute_ix
+        num_rows = int(block_sizes.sum())
+
+        index = np.full((len(symbols), num_sessions), -1, dtype=np.int64)
+        index.flat[blocks] = block_starts
+
+        if not os.path.isdir(self._rootdir):
+            os.makedirs(self._rootdir)
+
+        for column in BAR_COLUMNS:
+            out = _make_bar_out(column, num_rows)
+            out[rows] = df[column].values
+            out.astype('<f8').tofile(_column_path(self._rootdir, column))
+        index.astype('<i8').tofile(os.path.join(self._rootdir, INDEX_FILENAME))
+
+        metadata = {
+            'version': FORMAT_VERSION,
+            'columns': list(BAR_COLUMNS),
+            'exchange_symbols': symbols.tolist(),
+            'start_session_ns': int(layout.sessions[0]),
+            'end_session_ns': int(layout.sessions[-1]),
+            'calendar_name': self._calendar.name,
+        }
+        with open(os.path.join(self._rootdir, METADATA_FILENAME), 'w') as f:
+            json.dump(metadata, f)
+        return metadata
+
+
+class MmapMinuteBarReader(MinuteBarReader):
+    """
+    Reader for minute bars written by ``MmapMinuteBarWriter``.
+    Opening the reader only parses the metadata; the index and field files
+    are memory-mapped on first use, so a read only touches the pages of the
+    session blocks it covers.
+    Parameters
+    ----------
+    rootdir : str
+        The directory containing the bar files.
+    calendar : TradingCalendar, optional
+        The calendar used to write the bars. Defaults to the calendar named
+        in the metadata.
+    """
+    # Reads only slice read-only memory maps.
+    thread_safe = True
+
+    def __init__(self, rootdir, calendar=None):
+        self._rootdir = rootdir
+        with open(os.path.join(rootdir, METADATA_FILENAME)) as f:
+            metadata = json.load(f)
+
+        self._symbol_positions = {
+            exchange_symbol: i
+            for i, exchange_symbol in enumerate(metadata['exchange_symbols'])
+        }
+        self._start_session = pd.Timestamp(metadata['start_session_ns'], tz='UTC')
+        self._end_session = pd.Timestamp(metadata['end_session_ns'], tz='UTC')
+
+        if calendar is None:
+            calendar = get_calendar_registry().get_calendar(
+                metadata['calendar_name'])
+        self.calendar = calendar
+        self._columns = {}
+
+    @lazyval
+    def _layout(self):
+        return _SessionLayout(self.calendar,
+                              self._start_session,
+                              self._end_session)
+
+    @lazyval
+    def _index(self):
+        shape = len(self._symbol_positions), len(self._layout.sessions)
+        path = os.path.join(self._rootdir, INDEX_FILENAME)
+        if not os.path.getsize(path):
+            return np.full(shape, -1, dtype=np.int64)
+        return np.memmap(path, dtype='<i8', mode='r', shape=shape)
+
+    def _column(self, column):
+        try:
+            return self._columns[column]
+        except KeyError:
+            path = _column_path(self._rootdir, column)
+            if os.path.getsize(path):
+                array = np.memmap(path, dtype='<f8', mode='r')
+            else:
+                array = np.empty(0, dtype='<f8')
+            self._columns[column] = array
+            return array
+
+    def _symbol_ix(self, exchange_symbol):
+        if type(exchange_symbol) is not str:
+            exchange_symbol = exchange_symbol.exchange_symbol
+        return self._symbol_positions.get(exchange_symbol)
+
+    @property
+    def trading_calendar(self):
+        return self.calendar
+
+    @lazyval
+    def sessions(self):
+        return self.trading_calendar.sessions_in_range(self._start_session,
+                                                       self._end_session)
+
+    @lazyval
+    def first_trading_day(self):
+        return self._start_session
+
+    @lazyval
+    def last_available_dt(self):
+        layout = self._layout
+        last = len(layout.sessions) - 1
+        return layout.minute(last, layout.minute_counts[last] - 1)
+
+    def load_raw_arrays(self, columns, start_dt, end_dt, exchange_symbols):
+        """
+        Returns
+        -------
+        list of np.ndarray
+            A list with an entry per field of ndarrays with shape
+            (calendar minutes in range, len(exchange_symbols)). The minutes
+            outside of the sessions of the store are nan (0 for volume and
+            open_interest).
+        """
+        minutes = self.calendar.minutes_in_range(start_dt, end_dt)
+        shape = len(minutes), len(exchange_symbols)
+        out = [_make_bar_out(column, shape) for column in columns]
+        layout = self._layout
+        first, last = layout.minute_range(start_dt, end_dt)
+        if not shape[0] or first > last:
+            return out
+
+        first_session = layout.minute_offsets.searchsorted(first, side='right') - 1
+        last_session = layout.minute_offsets.searchsorted(last, side='right') - 1
+        # Row of the output holding the first minute of the store in range,
+        # which is after the start of the range if the store starts later.
+        first_row = minutes.searchsorted(layout.minute(
+            first_session, first - layout.minute_offsets[first_session]))
+        # Row of the output holding the first minute of each session, which
+        # is negative for a session that starts before the range.
+        session_rows = layout.minute_offsets[first_session:last_session + 1] - \
+            first + first_row
+        session_ends = session_rows + \
+            layout.minute_counts[first_session:last_session + 1]
+
+        for j, exchange_symbol in enumerate(exchange_symbols):
+            k = self._symbol_ix(exchange_symbol)
+            if k is None:
+                continue
+            block_starts = self._index[k, first_session:last_session + 1]
+            for i in np.flatnonzero(block_starts >= 0):
+                lo = max(session_rows[i], 0)
+                hi = min(session_ends[i], shape[0])
+                row = block_starts[i] + lo - session_rows[i]
+                for column, array in zip(columns, out):
+                    array[lo:hi, j] = self._column(column)[row:row + hi - lo]
+        return out
+
+    def get_value(self, exchange_symbol, dt, field):
+        """
+        Parameters
+        ----------
+        exchange_symbol : Exchange Symbol
+            The exchange_symbol to get.
+        dt : datetime64-like
+            The minute for which data is requested.
+        field : string
+            The price field. e.g. ('open', 'high', 'low', 'close', 'volume', 'open_interest')
+        Returns
+        -------
+        float
+            The value of field for the given exchange_symbol on the given
+            minute, which is nan (0 for volume and open_interest) if there is
+            no bar on that minute. Raises a NoDataOnDate exception if the
+            given minute is not a market minute or the exchange_symbol has
+            no bars.
+        """
+        layout = self._layout
+        session_ix, minute_ix = layout.locate(
+            np.array([pd.Timestamp(dt).value], dtype=np.int64))
+        session_ix, minute_ix = session_ix[0], minute_ix[0]
+        if session_ix < 0:
+            raise NoDataOnDate("minute={0} is not a market minute of "
+                               "calendar={1}".format(dt, self.calendar.name))
+        k = self._symbol_ix(exchange_symbol)
+        if k is None:
+            raise NoDataOnDate("minute={0} is outside of the range of "
+                               "{1}".format(dt, exchange_symbol))
+        block_start = self._index[k, session_ix]
+        if block_start < 0:
+            return _make_bar_out(field, 1)[0]
+        return self._column(field)[block_start + minute_ix]
+
+    def get_last_traded_dt(self, instrument, dt):
+        layout = self._layout
+        k = self._symbol_ix(instrument)
+        if k is None:
+            return pd.NaT
+        session_ix, minute_ix = layout.last_minute_at_or_before(
+            pd.Timestamp(dt).value)
+        if session_ix < 0:
+            return pd.NaT
+
+        close = self._column('close')
+        volume = self._column('volume')
+        block_starts = self._index[k, :session_ix + 1]
+        for i in np.flatnonzero(block_starts >= 0)[::-1]:
+            row = block_starts[i]
+            length = minute_ix + 1 if i == session_ix else layout.minute_counts[i]
+            traded = np.flatnonzero(~np.isnan(close[row:row + length]) &
+                                    (volume[row:row + length] != 0))
+            if len(traded):
+                return layout.minute(i, traded[-1])
+        return pd.NaT
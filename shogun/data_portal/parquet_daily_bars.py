@@ -0,0 +1,315 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from pandas import read_hdf
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from shogun.utils.memoize import lazyval
+from shogun.utils.calendar_registry import get_calendar_registry
+from shogun.data_portal.session_bars import SessionBarReader
+from shogun.data_portal.bar_reader import NoDataOnDate
+from shogun.data_portal.hdf_daily_bars import BAR_COLUMNS, _make_bar_out
+
+dirname = os.path.dirname(__file__)
+
+# Files starting with '_' are skipped when the dataset is discovered.
+METADATA_FILENAME = '_metadata.json'
+FORMAT_VERSION = 1
+DEFAULT_ROW_GROUP_SIZE = 16384
+
+ROOT_PARTITIONED_TYPES = frozenset({'Future', 'FutureOption'})
+
+
+def _partition_label(exchange_symbol, instrument_type):
+    """
+    Futures and future options are partitioned by root symbol, e.g. ES_Z97
+    and ES_C19_2725 both go to ES; everything else by instrument type.
+    """
+    if instrument_type in ROOT_PARTITIONED_TYPES:
+        return exchange_symbol.split('_')[0]
+    return instrument_type
+
+
+def _timestamp_scalar(dt):
+    return pa.scalar(pd.Timestamp(dt).value, type=pa.timestamp('ns'))
+
+
+class ParquetDailyBarWriter(object):
+    """
+    Writes daily bars into a hive partitioned parquet dataset which can be
+    read by ``ParquetDailyBarReader``.
+    Parameters
+    ----------
+    rootdir : str
+        The directory in which to write the dataset.
+    calendar : TradingCalendar
+        The calendar of the bars.
+    start_session : pd.Timestamp
+        The first session of the dataset.
+    end_session : pd.Timestamp
+        The last session of the dataset.
+    row_group_size : int, optional
+        The maximum number of rows per parquet row group.
+    Notes
+    -----
+    The bars are laid out as ``partition=<label>/year=<yyyy>/part-0.parquet``
+    where the label is the root symbol of futures and future options and the
+    instrument type of everything else. Within a file the rows are sorted by
+    (exchange_symbol, date), so the row group statistics of both columns are
+    tight enough for the reader to skip row groups by symbol and date.
+    """
+    def __init__(self, rootdir, calendar, start_session, end_session,
+                 row_group_size=DEFAULT_ROW_GROUP_SIZE):
+        self._rootdir = rootdir
+        self._calendar = calendar
+        self._start_session = start_session
+        self._end_session = end_session
+        self._row_group_size = row_group_size
+
+    def write_from_hdf(self, paths=None):
+        """
+        Convert the hdf pricing tables into this format.
+        Parameters
+        ----------
+        paths : iterable of str, optional
+            The hdf files to convert. Defaults to _InstrumentData.h5 and
+            _OptionData.h5.
+        """
+        if paths is None:
+            paths = (
+                dirname + '\..\database\_InstrumentData.h5',
+                dirname + '\..\database\_OptionData.h5',
+            )
+        return self.write(pd.concat([read_hdf(path) for path in paths]))
+
+    def _default_partitions(self, exchange_symbols):
+        router = read_hdf(dirname + '\..\database\_InstrumentRouter.h5')
+        instrument_types = router['instrument_type'].reindex(exchange_symbols)
+        return {
+            exchange_symbol: _partition_label(exchange_symbol, instrument_type)
+            if isinstance(instrument_type, str) else 'Unknown'
+            for exchange_symbol, instrument_type
+            in zip(exchange_symbols, instrument_types.values)
+        }
+
+    def write(self, df, partitions=None):
+        """
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Bars indexed by ('date', 'exchange_symbol') with the columns
+            listed in ``BAR_COLUMNS``.
+        partitions : dict, optional
+            Map from exchange_symbol -> partition label. Defaults to the root
+            symbol or instrument type found in _InstrumentRouter.h5.
+        """
+        sessions = self._calendar.sessions_in_range(self._start_session,
+                                                    self._end_session)
+
+        df = df.reset_index()
+        df['date'] = df['date'].values.astype('datetime64[ns]')
+        df = df[~df.duplicated(['exchange_symbol', 'date'], keep='last')]
+        df = df[(df['date'] >= sessions[0].tz_localize(None)) &
+                (df['date'] <= sessions[-1].tz_localize(None))]
+
+        symbols = df['exchange_symbol'].unique()
+        if partitions is None:
+            partitions = self._default_partitions(symbols)
+        partitions = {str(s): str(partitions[s]) for s in symbols}
+
+        labels = df['exchange_symbol'].map(partitions)
+        years = df['date'].dt.year
+        for (label, year), group in df.groupby([labels, years]):
+            group = group.sort_values(['exchange_symbol', 'date'], kind='mergesort')
+            table = pa.table(
+                [pa.array(group['date'].values, type=pa.timestamp('ns')),
+                 pa.array(group['exchange_symbol'].values.astype(str), type=pa.string())] +
+                [pa.array(group[column].values.astype(np.float64), from_pandas=True)
+                 for column in BAR_COLUMNS],
+                names=['date', 'exchange_symbol'] + list(BAR_COLUMNS),
+            )
+            path = os.path.join(self._rootdir,
+                                'partition={0}'.format(label),
+                                'year={0}'.format(year))
+            if not os.path.isdir(path):
+                os.makedirs(path)
+            pq.write_table(table,
+                           os.path.join(path, 'part-0.parquet'),
+                           row_group_size=self._row_group_size,
+                           compression='snappy')
+
+        metadata = {
+            'version': FORMAT_VERSION,
+            'columns': list(BAR_COLUMNS),
+            'partitions': partitions,
+            'start_session_ns': int(sessions[0].value),
+            'end_session_ns': int(sessions[-1].value),
+            'calendar_name': self._calendar.name,
+        }
+        with open(os.path.join(self._rootdir, METADATA_FILENAME), 'w') as f:
+            json.dump(metadata, f)
+        return metadata
+
+
+class ParquetDailyBarReader(SessionBarReader):
+    """
+    Reader for daily bars written by ``ParquetDailyBarWriter``.
+    Reads are pushed down to the parquet dataset as filters on the partition,
+    year, date and exchange_symbol, so only the files and row groups which
+    can hold requested bars are decoded. The Arrow buffers are then written
+    straight into the output arrays.
+    Parameters
+    ----------
+    rootdir : str
+        The directory containing the dataset.
+    calendar : TradingCalendar, optional
+        The calendar used to write the bars. Defaults to the calendar named
+        in the metadata.
+    Attributes
+    ----------
+    partitions : dict
+        Map from exchange_symbol -> label of the partition holding its bars.
+    """
+    def __init__(self, rootdir, calendar=None):
+        self._rootdir = rootdir
+        with open(os.path.join(rootdir, METADATA_FILENAME)) as f:
+            metadata = json.load(f)
+
+        self.partitions = metadata['partitions']
+        self._start_session = pd.Timestamp(metadata['start_session_ns'], tz='UTC')
+        self._end_session = pd.Timestamp(metadata['end_session_ns'], tz='UTC')
+
+        if calendar is None:
+            calendar = get_calendar_registry().get_calendar(
+                metadata['calendar_name'])
+        self.calendar = calendar
+
+    @lazyval
+    def _dataset(self):
+        partitioning = ds.partitioning(
+            pa.schema([('partition', pa.string()), ('year', pa.int32())]),
+            flavor='hive')
+        return ds.dataset(self._rootdir, format='parquet', partitioning=partitioning)
+
+    @property
+    def trading_calendar(self):
+        return self.calendar
+
+    @lazyval
+    def sessions(self):
+        return self.trading_calendar.sessions_in_range(self._start_session,
+                                                       self._end_session)
+
+    @lazyval
+    def first_trading_day(self):
+        return self._start_session
+
+    @property
+    def last_available_dt(self):
+        return self._end_session
+
+    def _filter(self, exchange_symbols, start_date, end_date):
+        """
+        Returns the dataset filter selecting the bars of ``exchange_symbols``
+        between ``start_date`` and ``end_date`` inclusive, or None if none of
+        the symbols are in the dataset.
+        """
+        labels = {self.partitions[s] for s in exchange_symbols if s in self.partitions}
+        if not labels:
+            return None
+        return (
+            ds.field('partition').isin(sorted(labels)) &
+            (ds.field('year') >= pd.Timestamp(start_date).year) &
+            (ds.field('year') <= pd.Timestamp(end_date).year) &
+            (ds.field('date') >= _timestamp_scalar(start_date)) &
+            (ds.field('date') <= _timestamp_scalar(end_date)) &
+            ds.field('exchange_symbol').isin(sorted(set(exchange_symbols)))
+        )
+
+    def load_raw_arrays(self, columns, start_date, end_date, exchange_symbols):
+        exchange_symbols = [t.exchange_symbol if type(t) is not str else t for t in exchange_symbols]
+        sessions = self.trading_calendar.sessions_in_range(start_date, end_date)
+        shape = len(sessions), len(exchange_symbols)
+        out = [_make_bar_out(column, shape) for column in columns]
+
+        query = self._filter(exchange_symbols, start_date, end_date)
+        if query is None or not len(sessions):
+            return out
+        table = self._dataset.to_table(
+            columns=['date', 'exchange_symbol'] + list(columns), filter=query)
+        if not table.num_rows:
+            return out
+
+        unique_symbols = list(dict.fromkeys(exchange_symbols))
+        symbol_col = {s: j for j, s in enumerate(unique_symbols)}
+        encoded = table.column('exchange_symbol').combine_chunks().dictionary_encode()
+        lookup = np.array([symbol_col.get(s, -1) for s in encoded.dictionary.to_pylist()],
+                          dtype=np.int64)
+        col_ix = lookup[encoded.indices.to_numpy(zero_copy_only=False)]
+
+        sessions_ns = sessions.asi8
+        dates = table.column('date').to_numpy().astype('datetime64[ns]').view(np.int64)
+        row_ix = sessions_ns.searchsorted(dates)
+        mask = (row_ix < len(sessions_ns)) & (col_ix >= 0)
+        mask[mask] = sessions_ns[row_ix[mask]] == dates[mask]
+        row_ix = row_ix[mask]
+        col_ix = col_ix[mask]
+
+        if len(unique_symbols) != len(exchange_symbols):
+            unique_shape = len(sessions), len(unique_symbols)
+            unique_out = [_make_bar_out(column, unique_shape) for column in columns]
+        else:
+            unique_out = out
+
+        for column, array in zip(columns, unique_out):
+            array[row_ix, col_ix] = table.column(column).to_numpy()[mask]
+
+        if unique_out is not out:
+            take = [symbol_col[s] for s in exchange_symbols]
+            out = [array[:, take] for array in unique_out]
+        return out
+
+    def get_value(self, exchange_symbol, dt, field):
+        """
+        Parameters
+        ----------
+        exchange_symbol : Exchange Symbol
+            The exchange_symbol to get.
+        day : datetime64-like
+            Midnight of the day for which data is requested.
+        colname : string
+            The price field. e.g. ('open', 'high', 'low', 'close', 'volume', 'open_interest')
+        Returns
+        -------
+        float
+            The spot price for colname of the given exchange_symbol on the given day.
+            Raises a NoDataOnDate exception if the given day and exchange_symbol is before
+            or after the date range of the instrument.
+        """
+        if type(exchange_symbol) is not str:
+            exchange_symbol = exchange_symbol.exchange_symbol
+        query = self._filter([exchange_symbol], dt, dt)
+        if query is not None:
+            table = self._dataset.to_table(columns=[field], filter=query)
+            if table.num_rows:
+                return table.column(field).to_numpy()[0]
+        raise NoDataOnDate("day={0} is outside of the range of {1}".format(
+            dt, exchange_symbol))
+
+    def get_last_traded_dt(self, instrument, dt):
+        exchange_symbol = instrument if type(instrument) is str else instrument.exchange_symbol
+        query = self._filter([exchange_symbol], self._start_session, dt)
+        if query is None:
+            return pd.NaT
+        query &= ds.field('close').is_valid() & \
+            (ds.field('volume').is_null() | (ds.field('volume') != 0))
+        table = self._dataset.to_table(columns=['date'], filter=query)
+        if not table.num_rows:
+            return pd.NaT
+        last = pc.max(table.column('date')).value
+        return pd.Timestamp(last, tz='UTC')
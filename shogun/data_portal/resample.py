@@ -1,9 +1,75 @@
 from abc import ABCMeta, abstractmethod
+import numpy as np
+import pandas as pd
+from lru import LRU
 from shogun.data_portal.bar_reader import NoDataOnDate
+from shogun.data_portal.hdf_daily_bars import BAR_COLUMNS, _make_bar_out
+from shogun.data_portal.minute_bars import MinuteBarReader
 from shogun.data_portal.session_bars import SessionBarReader
+from shogun.utils.calendar_registry import CalendarArrays, _as_nanos
 from shogun.utils.memoize import lazyval
 from six import with_metaclass
 
+DEFAULT_SYMBOL_CACHE_SIZE = 4096
+
+
+def _first_valid(data, valid, starts, missing):
+    """
+    Returns the first value of each column of ``data`` in each segment
+    starting at ``starts`` for which ``valid`` holds, or ``missing``.
+    """
+    rows = np.arange(len(data))[:, None]
+    first = np.minimum.reduceat(np.where(valid, rows, len(data)), starts,
+                                axis=0)
+    ends = np.append(starts[1:], len(data))[:, None]
+    values = data[np.minimum(first, len(data) - 1), np.arange(data.shape[1])]
+    return np.where(first < ends, values, missing)
+
+
+def _last_valid(data, valid, starts, missing):
+    """
+    Returns the last value of each column of ``data`` in each segment
+    starting at ``starts`` for which ``valid`` holds, or ``missing``.
+    """
+    rows = np.arange(len(data))[:, None]
+    last = np.maximum.reduceat(np.where(valid, rows, -1), starts, axis=0)
+    values = data[np.maximum(last, 0), np.arange(data.shape[1])]
+    return np.where(last >= starts[:, None], values, missing)
+
+
+def _minutes_to_sessions(minute_data, starts):
+    """
+    Aggregates minute bars into session bars.
+    Parameters
+    ----------
+    minute_data : list of np.ndarray
+        The minute bars of each field of ``BAR_COLUMNS``, in that order, with
+        shape (minutes, exchange_symbols).
+    starts : np.ndarray[int64]
+        The row of the first minute of each session.
+    Returns
+    -------
+    np.ndarray
+        The session bars, with shape (sessions, exchange_symbols,
+        len(BAR_COLUMNS)).
+    """
+    minutes = dict(zip(BAR_COLUMNS, minute_data))
+    open_interest = minutes['open_interest']
+    sessions = {
+        'open': _first_valid(minutes['open'], ~np.isnan(minutes['open']),
+                             starts, np.nan),
+        # fmax and fmin skip the minutes without a bar.
+        'high': np.fmax.reduceat(minutes['high'], starts, axis=0),
+        'low': np.fmin.reduceat(minutes['low'], starts, axis=0),
+        'close': _last_valid(minutes['close'], ~np.isnan(minutes['close']),
+                             starts, np.nan),
+        'volume': np.add.reduceat(minutes['volume'], starts, axis=0),
+        'open_interest': _last_valid(open_interest, open_interest != 0,
+                                     starts, 0),
+    }
+    return np.stack([sessions[column] for column in BAR_COLUMNS], axis=-1)
+
+
 class ReindexBarReader(with_metaclass(ABCMeta)):
     """
     A base class for readers which reindexes results, filling in the additional
@@ -40,6 +106,10 @@ class ReindexBarReader(with_metaclass(ABCMeta)):
         self._first_trading_session = first_trading_session
         self._last_trading_session = last_trading_session
 
+    @property
+    def thread_safe(self):
+        return self._reader.thread_safe
+
     @property
     def last_available_dt(self):
         return self._reader.last_available_dt
@@ -47,6 +117,9 @@ class ReindexBarReader(with_metaclass(ABCMeta)):
     def get_last_traded_dt(self, sid, dt):
         return self._reader.get_last_traded_dt(sid, dt)
 
+    def get_last_traded_dts(self, sids, dt):
+        return self._reader.get_last_traded_dts(sids, dt)
+
     @property
     def first_trading_day(self):
         return self._reader.first_trading_day
@@ -121,3 +194,181 @@ class ReindexSessionBarReader(ReindexBarReader, SessionBarReader):
     def _inner_dts(self, start_dt, end_dt):
         return self._reader.trading_calendar.sessions_in_range(
             start_dt, end_dt)
+
+
+class ReindexMinuteBarReader(ReindexBarReader, MinuteBarReader):
+    """
+    See: ``ReindexBarReader``
+    """
+
+    def _outer_dts(self, start_dt, end_dt):
+        return self.trading_calendar.minutes_in_range(start_dt, end_dt)
+
+    def _inner_dts(self, start_dt, end_dt):
+        return self._reader.trading_calendar.minutes_in_range(
+            start_dt, end_dt)
+
+
+class MinuteResampleSessionBarReader(SessionBarReader):
+    """
+    Reader for session bars derived from the minute bars of a minute bar
+    reader on demand, so that no daily copy of the bars is stored.
+    Parameters
+    ----------
+    calendar : TradingCalendar
+        The calendar of the sessions, which is also the calendar of the
+        minute bars.
+    minute_bar_reader : MinuteBarReader
+        The reader of the minute bars.
+    symbol_cache_size : int, optional
+        The number of exchange_symbols whose bars are kept once they have
+        been aggregated.
+    Notes
+    -----
+    The open and close of a session are its first and last minute prices,
+    high and low the max and min of its minute prices, skipping the minutes
+    without a bar, volume the sum of its minute volumes and open_interest
+    its last non-zero minute open interest. The minutes of every session
+    are aggregated at once with reductions over the session boundaries, and
+    all the fields of a bar are aggregated and cached together, so reading
+    another field of a cached bar does not read its minutes again. The
+    cached bars of an exchange_symbol cover a contiguous span of sessions,
+    which is widened when a read falls outside of it, so a cached read
+    takes a slice per exchange_symbol.
+    """
+    def __init__(self,
+                 calendar,
+                 minute_bar_reader,
+                 symbol_cache_size=DEFAULT_SYMBOL_CACHE_SIZE):
+        self._calendar = calendar
+        self._minute_bar_reader = minute_bar_reader
+        # Map from exchange_symbol -> (index of the first session in the
+        # calendar, bars of the span with shape (sessions, len(BAR_COLUMNS))).
+        self._spans = LRU(symbol_cache_size)
+
+    @lazyval
+    def _calendar_arrays(self):
+        return CalendarArrays(self._calendar)
+
+    def _aggregate(self, sessions_ns, exchange_symbols):
+        """
+        Returns the session bars of ``exchange_symbols`` on the contiguous
+        sessions ``sessions_ns``, from one read of their minutes. Only the
+        sessions the minute reader has bars for are read; the bars of the
+        others are missing (nan, 0 for volume and open_interest).
+        """
+        shape = len(sessions_ns), len(exchange_symbols)
+        bars = np.stack([_make_bar_out(column, shape) for column in BAR_COLUMNS],
+                        axis=-1)
+        lo = sessions_ns.searchsorted(pd.Timestamp(self.first_trading_day).value)
+        hi = sessions_ns.searchsorted(pd.Timestamp(self.last_available_dt).value,
+                                      side='right')
+        if lo >= hi:
+            return bars
+
+        arrays = self._calendar_arrays
+        session_ix = arrays.sessions.searchsorted(sessions_ns[lo:hi])
+        opens = arrays.opens[session_ix]
+        range_open = pd.Timestamp(opens[0], tz='UTC')
+        range_close = pd.Timestamp(arrays.closes[session_ix[-1]], tz='UTC')
+
+        minute_data = self._minute_bar_reader.load_raw_arrays(
+            BAR_COLUMNS, range_open, range_close, exchange_symbols)
+        minutes = _as_nanos(
+            self._calendar.minutes_in_range(range_open, range_close))
+        bars[lo:hi] = _minutes_to_sessions(minute_data,
+                                           minutes.searchsorted(opens))
+        return bars
+
+    @property
+    def trading_calendar(self):
+        return self._calendar
+
+    def load_raw_arrays(self, columns, start_date, end_date, exchange_symbols):
+        sessions_ns = _as_nanos(
+            self.trading_calendar.sessions_in_range(start_date, end_date))
+        shape = len(sessions_ns), len(exchange_symbols)
+        if not shape[0] or not shape[1]:
+            return [_make_bar_out(column, shape) for column in columns]
+
+        all_sessions = self._calendar_arrays.sessions
+        lo = all_sessions.searchsorted(sessions_ns[0])
+        hi = lo + len(sessions_ns)
+
+        keys = [t if type(t) is str else t.exchange_symbol
+                for t in exchange_symbols]
+        spans = self._spans
+        values = np.empty(shape + (len(BAR_COLUMNS),))
+        # The span of sessions each exchange_symbol missing from the cache
+        # will have once its bars are aggregated, which takes in the span it
+        # has cached so that the cached bars stay contiguous.
+        missing = {}
+        for j, key in enumerate(keys):
+            span = spans.get(key)
+            if span is not None:
+                span_lo, bars = span
+                if span_lo <= lo and hi <= span_lo + len(bars):
+                    values[:, j] = bars[lo - span_lo:hi - span_lo]
+                    continue
+                missing[j] = (min(lo, span_lo), max(hi, span_lo + len(bars)))
+            else:
+                missing[j] = (lo, hi)
+
+        if missing:
+            # The bars which are not cached are aggregated with one read of
+            # the span of sessions missing any of them.
+            symbol_ix = sorted(missing)
+            read_lo = min(missing[j][0] for j in symbol_ix)
+            read_hi = max(missing[j][1] for j in symbol_ix)
+            aggregated = self._aggregate(
+                all_sessions[read_lo:read_hi],
+                [exchange_symbols[j] for j in symbol_ix],
+            )
+            values[:, symbol_ix] = aggregated[lo - read_lo:hi - read_lo]
+            for k, j in enumerate(symbol_ix):
+                span_lo, span_hi = missing[j]
+                spans[keys[j]] = (
+                    span_lo,
+                    aggregated[span_lo - read_lo:span_hi - read_lo, k].copy(),
+                )
+
+        return [values[:, :, BAR_COLUMNS.index(column)] for column in columns]
+
+    def get_value(self, exchange_symbol, dt, field):
+        values = self.load_raw_arrays([field], dt, dt, [exchange_symbol])[0]
+        if not len(values):
+            raise NoDataOnDate("day={0} is not a session of calendar={1}"
+                               .format(dt, self.trading_calendar.name))
+        return values[0, 0]
+
+    @lazyval
+    def sessions(self):
+        cal = self._calendar
+        first = self._minute_bar_reader.first_trading_day
+        last = cal.minute_to_session_label(
+            self._minute_bar_reader.last_available_dt)
+        return cal.sessions_in_range(first, last)
+
+    @lazyval
+    def last_available_dt(self):
+        return self.trading_calendar.minute_to_session_label(
+            self._minute_bar_reader.last_available_dt
+        )
+
+    @property
+    def first_trading_day(self):
+        return self._minute_bar_reader.first_trading_day
+
+    def get_last_traded_dt(self, instrument, dt):
+        # Search through the close of the session at or before dt, so that
+        # the minutes of that session are included.
+        arrays = self._calendar_arrays
+        session_ix = arrays.sessions.searchsorted(pd.Timestamp(dt).value,
+                                                  side='right') - 1
+        if session_ix < 0:
+            return pd.NaT
+        last_traded = self._minute_bar_reader.get_last_traded_dt(
+            instrument, pd.Timestamp(arrays.closes[session_ix], tz='UTC'))
+        if pd.isnull(last_traded):
+            return pd.NaT
+        return self.trading_calendar.minute_to_session_label(last_traded)
@@ -1,11 +1,12 @@
 import warnings
-import trading_calendars
 from datetime import date, datetime, timedelta
 import pandas as pd
 from itertools import chain
 from functools import partial
 
 from .future_contract_day import FutureContractDay
+from .metadata_registry import get_contract_listing_registry
+from shogun.utils.calendar_registry import get_calendar_registry
 from pandas.errors import PerformanceWarning
 from pandas.tseries.offsets import *
 from pandas.tseries.holiday import (
@@ -102,13 +103,16 @@ class FutureRootFactory(object):
         The financial center where exchange is located
     """
     ## what happens if there are duplicate roots?
-    def __init__(self):
+    def __init__(self, listing_registry=None):
         self._country_code = pd.read_csv(dirname + "\_CountryCode.csv", keep_default_na=False)
         self._asset_class = pd.read_csv(dirname + "\_AssetClass.csv")
         self._currency_code = pd.read_csv(dirname + "\_CurrencyCode.csv")
         self._exchange_code = pd.read_csv(dirname + "\_ExchangeCode.csv")
         self._financial_center = pd.read_csv(dirname + "\_FinancialCenter.csv")
-        self._future_contract_listing = pd.read_csv(dirname + "\_FutureRootContractListingTable.csv")
+        if listing_registry is None:
+            listing_registry = get_contract_listing_registry()
+        self._listing_registry = listing_registry
+        self._future_contract_listing = listing_registry.table
         self._future_root = pd.read_csv(dirname + "\_FutureRootTable.csv")
         self._platform_symbol_mapping = pd.read_csv(dirname + "\_PlatformSymbolMapping.csv")
         self._future_calendar_rules = pd.read_csv(dirname + "\_FutureRootContractCalendarRules.csv")
@@ -150,9 +154,7 @@ class FutureRootFactory(object):
             self._future_root['root_symbol'] == root_symbol
             ].set_index('root_symbol').to_dict()['parent_calendar_id'][root_symbol]
 
-        root_contract_df = self._future_contract_listing[
-                (self._future_contract_listing['root_symbol'] == root_symbol)
-                ]
+        root_contract_df = self._listing_registry.listing(root_symbol)
 
         listed_contracts = list(root_contract_df['delivery_month'])
 
@@ -229,7 +231,7 @@ class FutureRootFactory(object):
         except KeyError:
             print('contract listing not found: constructing list')
             # get listing rules for root_symbol
-            df = query_df(self._future_contract_listing, {'root_symbol': root_symbol})
+            df = self._listing_registry.listing(root_symbol)
 
             # Set up calendar and date rules
             self.make_future_contract_day(root_symbol)
@@ -290,9 +292,9 @@ class FutureRootFactory(object):
 
             # Set up calendar and date rules
             if product_group_id == 'nan':
-                exchange_calendar = trading_calendars.get_calendar(exchange_id)
+                exchange_calendar = get_calendar_registry().get_calendar(exchange_id)
             else:
-                exchange_calendar = trading_calendars.get_calendar(exchange_id, product_group_id)
+                exchange_calendar = get_calendar_registry().get_calendar(exchange_id, product_group_id)
 
             exchange_holidays = exchange_calendar.regular_holidays.holidays()
             class ExchangeDay(CustomBusinessDay):
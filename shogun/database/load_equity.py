@@ -2,7 +2,6 @@ import os.path
 import numpy as np
 import pandas as pd
 import logging
-import trading_calendars
 import time as time
 import math
 import eikon as ek
@@ -15,6 +14,8 @@ from pandas import read_hdf
 from pandas import HDFStore,DataFrame
 
 from shogun.utils.query_utils import query_df
+from shogun.utils.pandas_utils import write_hdf_session_bounds
+from shogun.utils.calendar_registry import get_calendar_registry
 
 import os
 dirname = os.path.dirname(__file__)
@@ -36,7 +37,7 @@ def update_us_equity(factory,dt,platform='RIC'):
 
     exchange_id = 'XNYS'
 
-    if not trading_calendars.get_calendar(exchange_id).is_session(dt):
+    if not get_calendar_registry().get_calendar(exchange_id).is_session(dt):
             # check if today is exchange holiday/weekend
             print('{dt} not a valid session: do nothing'.format(dt=dt.strftime("%Y-%m-%d")))
             return
@@ -227,6 +228,7 @@ def write_to_instrument_table(dirname, data_df):
         instrument_data_hdf.sort_index(level=['date','exchange_symbol'], ascending=[1, 0], inplace=True)
         instrument_data_hdf.to_hdf(dirname +'\_InstrumentData.h5', 'InstrumentData', mode = 'w',
            format='table', data_columns=True)
+        write_hdf_session_bounds(dirname +'\_InstrumentData.h5', 'InstrumentData', instrument_data_hdf)
         instrument_data_hdf.to_csv(dirname + "\_InstrumentData.csv")
     else:
         print("Table does not exist! Writing new. ")
@@ -234,6 +236,7 @@ def write_to_instrument_table(dirname, data_df):
         instrument_data_hdf.sort_index(level=['date','exchange_symbol'], ascending=[1, 0], inplace=True)
         instrument_data_hdf.to_hdf(dirname +'\_InstrumentData.h5', 'InstrumentData', mode = 'w',
                         format='table', data_columns=True)
+        write_hdf_session_bounds(dirname +'\_InstrumentData.h5', 'InstrumentData', instrument_data_hdf)
         instrument_data_hdf.to_csv(dirname + "\_InstrumentData.csv")
 
 def check_missing_extra_days(factory, data_df):
@@ -241,12 +244,12 @@ def check_missing_extra_days(factory, data_df):
     grouped_df = data_df.groupby('exchange_symbol')
     for exchange_symbol in grouped_df.groups:
         exchange_id = 'XNYS'
-        cal = trading_calendars.get_calendar(exchange_id)
-        expected = cal.sessions_in_range(grouped_df.get_group(exchange_symbol).index.values[0],
+        cal = get_calendar_registry().get_calendar_arrays(exchange_id)
+        expected = cal.calendar.sessions_in_range(grouped_df.get_group(exchange_symbol).index.values[0],
                                          grouped_df.get_group(exchange_symbol).index.values[-1]
                                          )
         actual = pd.DatetimeIndex(grouped_df.get_group(exchange_symbol).index.values, tz='UTC')
-        extra = set(actual).difference(expected)
+        extra = set(actual[~cal.is_session(actual)])
         missing = set(expected).difference(actual)
         if len(extra) >0:
             print("{exchange_symbol} did not expect: {extra}".format(exchange_symbol=exchange_symbol, extra=set([d.strftime("%Y-%m-%d") for d in extra])))
@@ -2,7 +2,6 @@ import os.path
 import numpy as np
 import pandas as pd
 import logging
-import trading_calendars
 import time as time
 import eikon as ek
 ek.set_app_key('48f17fdf21184b0ca9c4ea8913a840a92b338918')
@@ -13,6 +12,8 @@ from pandas import read_hdf
 from pandas import HDFStore,DataFrame
 
 from shogun.utils.query_utils import query_df
+from shogun.utils.pandas_utils import write_hdf_session_bounds
+from shogun.utils.calendar_registry import get_calendar_registry
 
 import os
 dirname = os.path.dirname(__file__)
@@ -228,12 +229,12 @@ def update_future(factory,root_symbol,dt,platform='RIC'):
     # if missing, set to calendar default
     if product_group_id == 'nan':
         # check if today is exchange holiday/weekend
-        if not trading_calendars.get_calendar(exchange_id).is_session(dt):
+        if not get_calendar_registry().get_calendar(exchange_id).is_session(dt):
             print('{dt} not a valid session: do nothing'.format(dt=dt.strftime("%Y-%m-%d")))
             return
     else:
         # check if today is exchange holiday/weekend
-        if not trading_calendars.get_calendar(exchange_id, product_group_id).is_session(dt):
+        if not get_calendar_registry().get_calendar(exchange_id, product_group_id).is_session(dt):
             print('{dt} not a valid session: do nothing'.format(dt=dt.strftime("%Y-%m-%d")))
             return
 
@@ -350,6 +351,7 @@ def write_to_instrument_table(dirname, data_df):
         instrument_data_hdf.sort_index(level=['date','exchange_symbol'], ascending=[1, 0], inplace=True)
         instrument_data_hdf.to_hdf(dirname +'\_InstrumentData.h5', 'InstrumentData', mode = 'w',
            format='table', data_columns=True)
+        write_hdf_session_bounds(dirname +'\_InstrumentData.h5', 'InstrumentData', instrument_data_hdf)
         instrument_data_hdf.to_csv(dirname + "\_InstrumentData.csv")
     else:
         print("Table does not exist! Writing new. ")
@@ -357,6 +359,7 @@ def write_to_instrument_table(dirname, data_df):
         instrument_data_hdf.sort_index(level=['date','exchange_symbol'], ascending=[1, 0], inplace=True)
         instrument_data_hdf.to_hdf(dirname +'\_InstrumentData.h5', 'InstrumentData', mode = 'w',
                         format='table', data_columns=True)
+        write_hdf_session_bounds(dirname +'\_InstrumentData.h5', 'InstrumentData', instrument_data_hdf)
         instrument_data_hdf.to_csv(dirname + "\_InstrumentData.csv")
 
 def calc_start_end_dates(data_df):
@@ -473,16 +476,16 @@ def check_missing_extra_days(factory, data_df):
                         ].set_index('root_symbol').to_dict()['child_calendar_id'][root_symbol])
         # if missing, set to calendar default
         if product_group_id == 'nan':
-            cal = trading_calendars.get_calendar(exchange_id)
+            cal = get_calendar_registry().get_calendar_arrays(exchange_id)
         else:
-            cal = trading_calendars.get_calendar(exchange_id, product_group_id)
+            cal = get_calendar_registry().get_calendar_arrays(exchange_id, product_group_id)
 
-        expected = cal.sessions_in_range(grouped_df.get_group(exchange_symbol).index.values[0],
+        expected = cal.calendar.sessions_in_range(grouped_df.get_group(exchange_symbol).index.values[0],
                                          grouped_df.get_group(exchange_symbol).index.values[-1]
                                          )
         actual = pd.DatetimeIndex(grouped_df.get_group(exchange_symbol).index.values, tz='UTC')
 
-        extra = set(actual).difference(expected)
+        extra = set(actual[~cal.is_session(actual)])
         missing = set(expected).difference(actual)
 
         if len(extra) >0:
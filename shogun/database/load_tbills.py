@@ -2,7 +2,6 @@ import os.path
 import numpy as np
 import pandas as pd
 import logging
-import trading_calendars
 import time as time
 import eikon as ek
 ek.set_app_key('48f17fdf21184b0ca9c4ea8913a840a92b338918')
@@ -14,6 +13,8 @@ from pandas import read_hdf
 from pandas import HDFStore,DataFrame
 
 from shogun.utils.query_utils import query_df
+from shogun.utils.pandas_utils import write_hdf_session_bounds
+from shogun.utils.calendar_registry import get_calendar_registry
 from shogun.analytics.bondmath import billprice
 
 import os
@@ -34,7 +35,7 @@ def update_tbill(factory,dt,platform='RIC'):
 
     exchange_id = 'USBOND'
 
-    if not trading_calendars.get_calendar(exchange_id).is_session(dt):
+    if not get_calendar_registry().get_calendar(exchange_id).is_session(dt):
             # check if today is exchange holiday/weekend
             print('{dt} not a valid session: do nothing'.format(dt=dt.strftime("%Y-%m-%d")))
             return
@@ -123,7 +124,7 @@ def update_missing_tbill(factory,dt,platform='RIC'):
 
     exchange_id = 'USBOND'
 
-    if not trading_calendars.get_calendar(exchange_id).is_session(dt):
+    if not get_calendar_registry().get_calendar(exchange_id).is_session(dt):
             # check if today is exchange holiday/weekend
             print('{dt} not a valid session: do nothing'.format(dt=dt.strftime("%Y-%m-%d")))
             return
@@ -290,6 +291,7 @@ def write_to_instrument_table(dirname, data_df):
         instrument_data_hdf.sort_index(level=['date','exchange_symbol'], ascending=[1, 0], inplace=True)
         instrument_data_hdf.to_hdf(dirname +'\_InstrumentData.h5', 'InstrumentData', mode = 'w',
            format='table', data_columns=True)
+        write_hdf_session_bounds(dirname +'\_InstrumentData.h5', 'InstrumentData', instrument_data_hdf)
         instrument_data_hdf.to_csv(dirname + "\_InstrumentData.csv")
     else:
         print("Table does not exist! Writing new. ")
@@ -297,6 +299,7 @@ def write_to_instrument_table(dirname, data_df):
         instrument_data_hdf.sort_index(level=['date','exchange_symbol'], ascending=[1, 0], inplace=True)
         instrument_data_hdf.to_hdf(dirname +'\_InstrumentData.h5', 'InstrumentData', mode = 'w',
                         format='table', data_columns=True)
+        write_hdf_session_bounds(dirname +'\_InstrumentData.h5', 'InstrumentData', instrument_data_hdf)
         instrument_data_hdf.to_csv(dirname + "\_InstrumentData.csv")
 
 def check_missing_extra_days(factory, data_df):
@@ -306,14 +309,14 @@ def check_missing_extra_days(factory, data_df):
 
     for exchange_symbol in grouped_df.groups:
         exchange_id = 'XNYS'
-        cal = trading_calendars.get_calendar(exchange_id)
+        cal = get_calendar_registry().get_calendar_arrays(exchange_id)
 
-        expected = cal.sessions_in_range(grouped_df.get_group(exchange_symbol).index.values[0],
+        expected = cal.calendar.sessions_in_range(grouped_df.get_group(exchange_symbol).index.values[0],
                                          grouped_df.get_group(exchange_symbol).index.values[-1]
                                          )
         actual = pd.DatetimeIndex(grouped_df.get_group(exchange_symbol).index.values, tz='UTC')
 
-        extra = set(actual).difference(expected)
+        extra = set(actual[~cal.is_session(actual)])
         missing = set(expected).difference(actual)
 
         if len(extra) >0:
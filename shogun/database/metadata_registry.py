@@ -0,0 +1,87 @@
+import pandas as pd
+
+from shogun.utils.memoize import lazyval
+from shogun.database.metadata_snapshot import get_metadata_snapshot
+
+import os
+dirname = os.path.dirname(__file__)
+
+
+class ContractListingRegistry(object):
+    """
+    Parsed copy of the future root contract listing table, shared by the
+    instruments and database packages.
+    Parameters
+    ----------
+    path : str, optional
+        The path of the listing table. Defaults to
+        _FutureRootContractListingTable.csv.
+    snapshot : MetadataSnapshot, optional
+        The snapshot the table is loaded through. Defaults to the
+        process-wide snapshot.
+    """
+    def __init__(self, path=None, snapshot=None):
+        if path is None:
+            path = dirname + "\_FutureRootContractListingTable.csv"
+        if snapshot is None:
+            snapshot = get_metadata_snapshot()
+        self.path = path
+        self._snapshot = snapshot
+
+    @lazyval
+    def table(self):
+        """
+        The full listing table.
+        """
+        return self._snapshot.load('FutureRootContractListingTable',
+                                   self.path, pd.read_csv)
+
+    @lazyval
+    def _listings(self):
+        return {
+            root_symbol: df
+            for root_symbol, df in self.table.groupby('root_symbol', sort=False)
+        }
+
+    @lazyval
+    def _delivery_months(self):
+        delivery_months = {}
+        for root_symbol, df in self._listings.items():
+            delivery_months[root_symbol] = {
+                False: frozenset(df['delivery_month']),
+                True: frozenset(df[df['active'] == 1]['delivery_month']),
+            }
+        return delivery_months
+
+    def listing(self, root_symbol):
+        """
+        Returns the rows of the listing table for ``root_symbol``, which are
+        empty if the root is not listed.
+        """
+        try:
+            return self._listings[root_symbol]
+        except KeyError:
+            return self.table.iloc[0:0]
+
+    def delivery_months(self, root_symbol, active=True):
+        """
+        Returns the delivery month codes listed for ``root_symbol``, limited
+        to the active months if ``active``.
+        """
+        try:
+            return self._delivery_months[root_symbol][bool(active)]
+        except KeyError:
+            return frozenset()
+
+
+_contract_listing_registry = None
+
+
+def get_contract_listing_registry():
+    """
+    Returns the process-wide ContractListingRegistry.
+    """
+    global _contract_listing_registry
+    if _contract_listing_registry is None:
+        _contract_listing_registry = ContractListingRegistry()
+    return _contract_listing_registry
@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import pickle
+
+import pandas as pd
+
+from shogun.utils.memoize import lazyval
+
+dirname = os.path.dirname(__file__)
+
+SNAPSHOT_VERSION = 1
+MANIFEST_FILENAME = 'manifest.json'
+_DIGEST_CHUNK_SIZE = 1 << 20
+# Pickles are only reused by the pandas version and pickle protocol which
+# wrote them; pickled frames are not portable across pandas versions.
+_PICKLE_KEY = 'pandas-{0}-protocol-{1}'.format(pd.__version__,
+                                               pickle.HIGHEST_PROTOCOL)
+
+
+def _file_digest(path):
+    digest = hashlib.sha1()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(_DIGEST_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _atomic_write(path, write):
+    tmp_path = '{0}.{1}.tmp'.format(path, os.getpid())
+    try:
+        with open(tmp_path, 'wb') as f:
+            write(f)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+class MetadataSnapshot(object):
+    """
+    Pickled copies of the metadata tables in the database directory, keyed by
+    a content hash of the file each table was parsed from.
+    A table is parsed from its source the first time it is requested and
+    unpickled on every later request until the source changes, at which point
+    it is parsed and pickled again.
+    Parameters
+    ----------
+    rootdir : str, optional
+        The directory holding the snapshot. Defaults to _MetadataSnapshot
+        in the database directory.
+    Notes
+    -----
+    The manifest records the size, mtime and digest of each source. The
+    digest is only recomputed when the size or mtime of a source no longer
+    match, so checking a fresh table costs a stat call. The snapshot is a
+    cache: if it cannot be read or written the table is parsed from its
+    source. Snapshots written by another pandas version or pickle protocol
+    are ignored, as is any table which fails to unpickle.
+    """
+    def __init__(self, rootdir=None):
+        if rootdir is None:
+            rootdir = dirname + "\_MetadataSnapshot"
+        self._rootdir = rootdir
+
+    @lazyval
+    def _manifest(self):
+        try:
+            with open(os.path.join(self._rootdir, MANIFEST_FILENAME)) as f:
+                manifest = json.load(f)
+        except (IOError, OSError, ValueError):
+            return {}
+        if (manifest.get('version') != SNAPSHOT_VERSION or
+                manifest.get('pickle_key') != _PICKLE_KEY):
+            return {}
+        return manifest.get('tables', {})
+
+    def _table_path(self, name, digest):
+        return os.path.join(self._rootdir, '{0}-{1}-{2}.pickle'.format(
+            name, digest, _PICKLE_KEY))
+
+    def _digest(self, name, path, stat):
+        entry = self._manifest.get(name)
+        if (entry is not None and
+                entry['path'] == path and
+                entry['size'] == stat.st_size and
+                entry['mtime_ns'] == stat.st_mtime_ns):
+            return entry['digest']
+        return _file_digest(path)
+
+    def load(self, name, path, reader):
+        """
+        Returns the table ``name`` parsed from ``path``.
+        Parameters
+        ----------
+        name : str
+            The name of the table in the snapshot.
+        path : str
+            The source file of the table.
+        reader : callable
+            Parses the table from ``path``; only called if the snapshot does
+            not hold a table for the current contents of ``path``.
+        """
+        stat = os.stat(path)
+        digest = self._digest(name, path, stat)
+        table_path = self._table_path(name, digest)
+
+        try:
+            with open(table_path, 'rb') as f:
+                table = pickle.load(f)
+        except Exception:
+            # A missing, truncated or otherwise unreadable pickle, e.g. one
+            # referring to classes which have since moved or changed.
+            table = reader(path)
+            try:
+                self._write(name, path, stat, digest, table)
+            except (IOError, OSError):
+                pass
+            return table
+
+        self._remember(name, path, stat, digest)
+        return table
+
+    def _write(self, name, path, stat, digest, table):
+        if not os.path.isdir(self._rootdir):
+            os.makedirs(self._rootdir)
+        _atomic_write(
+            self._table_path(name, digest),
+            lambda f: pickle.dump(table, f, protocol=pickle.HIGHEST_PROTOCOL),
+        )
+
+        previous = self._manifest.get(name)
+        if previous is not None and previous['digest'] != digest:
+            stale = self._table_path(name, previous['digest'])
+            if os.path.exists(stale):
+                os.remove(stale)
+        self._remember(name, path, stat, digest, force=True)
+
+    def _remember(self, name, path, stat, digest, force=False):
+        entry = {
+            'path': path,
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'digest': digest,
+        }
+        if not force and self._manifest.get(name) == entry:
+            return
+        self._manifest[name] = entry
+        try:
+            manifest = json.dumps({
+                'version': SNAPSHOT_VERSION,
+                'pickle_key': _PICKLE_KEY,
+                'tables': self._manifest,
+            }).encode('utf-8')
+            _atomic_write(os.path.join(self._rootdir, MANIFEST_FILENAME),
+                          lambda f: f.write(manifest))
+        except (IOError, OSError):
+            pass
+
+
+_metadata_snapshot = None
+
+
+def get_metadata_snapshot():
+    """
+    Returns the process-wide MetadataSnapshot.
+    """
+    global _metadata_snapshot
+    if _metadata_snapshot is None:
+        _metadata_snapshot = MetadataSnapshot()
+    return _metadata_snapshot
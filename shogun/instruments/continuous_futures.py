@@ -1,12 +1,11 @@
 from functools import partial
 import pandas as pd
-from numpy import array, empty, iinfo
+from numpy import array, empty, iinfo, int64, maximum
 from pandas import Timestamp
-from trading_calendars import get_calendar
 import warnings
 
-import os
-dirname = os.path.dirname(__file__)
+from shogun.database.metadata_registry import get_contract_listing_registry
+from shogun.utils.calendar_registry import get_calendar_registry
 
 def delivery_predicate(codes, contract):
     # This relies on symbols that are construct following a pattern of
@@ -142,7 +141,7 @@ class ContinuousFuture(object):
         boolean: whether the continuous futures's exchange is open at the
         given minute.
         """
-        calendar = get_calendar(self.exchange)
+        calendar = get_calendar_registry().get_calendar(self.exchange)
         return calendar.is_open_on_minute(dt_minute)
 
 class ContractNode(object):
@@ -185,14 +184,20 @@ class OrderedContracts(object):
     auto_close_date : long[:]
         The auto close dates of the contracts in the chain.
         Corresponds by index with contract_sids.
+    exchange_symbols : object[:]
+        The exchange_symbols of the contracts in the chain, in order.
     chain_predicates : dict
         A dict mapping root symbol to a predicate function which accepts a contract
     as a parameter and returns whether or not the contract should be included in the
     chain.
+    listing_registry : ContractListingRegistry, optional
+        The registry of listed delivery months. Defaults to the process-wide
+        registry.
     """
 
-    def __init__(self, root_symbol, contracts, active=True):
-        self._future_contract_listing = pd.read_csv(dirname + "\..\database\_FutureRootContractListingTable.csv")
+    def __init__(self, root_symbol, contracts, active=True, listing_registry=None):
+        if listing_registry is None:
+            listing_registry = get_contract_listing_registry()
 
         self.root_symbol = root_symbol
 
@@ -201,18 +206,8 @@ class OrderedContracts(object):
         self._start_date = iinfo('int64').max
         self._end_date = 0
 
-        # assumes that root_symbol is in table, need a check here
-        if active:
-            chain_predicate = partial(delivery_predicate,
-                set(self._future_contract_listing[
-                    (self._future_contract_listing['root_symbol'] == self.root_symbol) &
-                    (self._future_contract_listing['active'] == 1)
-                    ]['delivery_month']))
-        else:
-            chain_predicate = partial(delivery_predicate,
-                set(self._future_contract_listing[
-                    (self._future_contract_listing['root_symbol'] == self.root_symbol)
-                    ]['delivery_month']))
+        chain_predicate = partial(delivery_predicate,
+            listing_registry.delivery_months(self.root_symbol, active))
 
         self._head_contract = None
         prev = None
@@ -241,44 +236,52 @@ class OrderedContracts(object):
             prev.next = curr
             prev = curr
 
+        # The chain is also kept as arrays aligned by position, so that
+        # lookups are searches and index arithmetic instead of list walks.
+        chain = []
+        curr = self._head_contract
+        while curr is not None:
+            chain.append(curr.contract)
+            curr = curr.next
+        self.exchange_symbols = array(
+            [contract.exchange_symbol for contract in chain], dtype=object)
+        self.start_dates = array(
+            [contract.start_date.value for contract in chain], dtype=int64)
+        self.auto_close_dates = array(
+            [contract.auto_close_date.value for contract in chain], dtype=int64)
+        # Running max of the auto close dates, which is sorted even if the
+        # auto close dates are not.
+        self._max_auto_close_dates = maximum.accumulate(self.auto_close_dates)
+        self._positions = {
+            exchange_symbol: i for i, exchange_symbol in enumerate(self.exchange_symbols)
+        }
+
     def contract_before_auto_close(self, dt_value):
         """
         Get the contract with next upcoming auto close date.
         """
-        curr = self._head_contract
-        while curr.next is not None:
-            if curr.contract.auto_close_date.value > dt_value:
-                break
-            curr = curr.next
-        return curr.contract.exchange_symbol
+        if not len(self.exchange_symbols):
+            return None
+        ix = self._max_auto_close_dates.searchsorted(dt_value, side='right')
+        return self.exchange_symbols[min(ix, len(self.exchange_symbols) - 1)]
 
     def contract_at_offset(self, exchange_symbol, offset, start_cap):
         """
         Get the exchange_symbol which is the given exchange_symbol plus the offset distance.
-        An offset of 0 should be reflexive.
+        An offset of 0 should be reflexive, as is a negative offset.
         """
-        curr = self.exchange_symbol_to_contract[exchange_symbol]
-        i = 0
-        while i < offset:
-            if curr.next is None:
-                return None
-            curr = curr.next
-            i += 1
-        if curr.contract.start_date.value <= start_cap:
-            return curr.contract.exchange_symbol
+        ix = self._positions[exchange_symbol] + max(offset, 0)
+        if ix >= len(self.exchange_symbols):
+            return None
+        if self.start_dates[ix] <= start_cap:
+            return self.exchange_symbols[ix]
         else:
             return None
 
     def active_chain(self, starting_exchange_symbol, dt_value):
-        curr = self.exchange_symbol_to_contract[starting_exchange_symbol]
-        contracts = []
-
-        while curr is not None:
-            if curr.contract.start_date.value <= dt_value:
-                contracts.append(curr.contract.exchange_symbol)
-            curr = curr.next
-
-        return array(contracts, dtype='str')
+        ix = self._positions[starting_exchange_symbol]
+        started = self.start_dates[ix:] <= dt_value
+        return array(self.exchange_symbols[ix:][started], dtype='str')
 
     @property
     def start_date(self):
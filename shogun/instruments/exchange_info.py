@@ -1,4 +1,4 @@
-from trading_calendars import get_calendar
+from shogun.utils.calendar_registry import get_calendar_registry
 
 
 class ExchangeInfo(object):
@@ -46,7 +46,7 @@ class ExchangeInfo(object):
 
     @property
     def calendar(self):
-        return get_calendar(self.canonical_name)
+        return get_calendar_registry().get_calendar(self.canonical_name)
 
     def __eq__(self, other):
         if not isinstance(other, ExchangeInfo):
@@ -1,13 +1,47 @@
-from trading_calendars import get_calendar
 import math
 import numpy as np
+from pandas import Timestamp, isnull
 from string import ascii_lowercase
+
+from shogun.utils.calendar_registry import get_calendar_registry
+
 LETTERS = {letter: str(index) for index, letter in enumerate(ascii_lowercase, start=1)}
 LETTERS['_'] = '0'
 
 #from .instrument_finder import InstrumentFinder
 #instrument_finder = InstrumentFinder()
 
+def _to_nanos(value):
+    if value is None or type(value) is int:
+        return value
+    if isnull(value):
+        return None
+    return Timestamp(value).value
+
+class _DateField(object):
+    """
+    A date attribute of an instrument.
+    The date is kept in the slot of the same name with a leading underscore
+    as int64 nanoseconds since the epoch (UTC), and a pd.Timestamp is only
+    built when the attribute is read. Missing dates are kept as None.
+    The attribute can be set to anything pd.Timestamp accepts; an int is
+    taken to be nanoseconds already.
+    """
+    def __set_name__(self, owner, name):
+        self.name = name
+        self._slot = owner.__dict__['_' + name]
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = self._slot.__get__(instance, owner)
+        if value is None:
+            return None
+        return Timestamp(value, tz='UTC')
+
+    def __set__(self, instance, value):
+        self._slot.__set__(instance, _to_nanos(value))
+
 class Instrument(object):
     """
     An Instrument represents the metadata of a symbol
@@ -32,6 +66,30 @@ class Instrument(object):
         'child_calendar_id'
     })
 
+    __slots__ = (
+        'exchange_symbol',
+        'instrument_name',
+        'instrument_country_id',
+        'underlying_name',
+        'underlying_asset_class_id',
+        'settle_start',
+        'settle_end',
+        'settle_method',
+        'settle_timezone',
+        'quote_currency_id',
+        'multiplier',
+        'tick_size',
+        '_start_date',
+        '_end_date',
+        'exchange_info',
+        'parent_calendar_id',
+        'child_calendar_id',
+        '__weakref__',
+    )
+
+    start_date = _DateField()
+    end_date = _DateField()
+
     def __init__(self,
                 exchange_symbol="",
                 instrument_name="",
@@ -164,7 +222,7 @@ class Instrument(object):
         -------
         boolean: whether the asset's exchange is open at the given minute.
         """
-        calendar = get_calendar(self.exchange)
+        calendar = get_calendar_registry().get_calendar(self.exchange)
         return calendar.is_open_on_minute(dt_minute)
 
 class Future(Instrument):
@@ -211,6 +269,44 @@ class Future(Instrument):
         'delivery_year',
     })
 
+    __slots__ = (
+        'root_symbol',
+        'final_settle_start',
+        'final_settle_end',
+        'final_settle_method',
+        'final_settle_timezone',
+        'last_trade_time',
+        '_first_trade',
+        '_last_trade',
+        '_first_position',
+        '_last_position',
+        '_first_notice',
+        '_last_notice',
+        '_first_delivery',
+        '_last_delivery',
+        '_settlement_date',
+        '_volume_switch_date',
+        '_open_interest_switch_date',
+        '_auto_close_date',
+        'average_pricing',
+        'deliverable',
+        'delivery_month',
+        'delivery_year',
+    )
+
+    first_trade = _DateField()
+    last_trade = _DateField()
+    first_position = _DateField()
+    last_position = _DateField()
+    first_notice = _DateField()
+    last_notice = _DateField()
+    first_delivery = _DateField()
+    last_delivery = _DateField()
+    settlement_date = _DateField()
+    volume_switch_date = _DateField()
+    open_interest_switch_date = _DateField()
+    auto_close_date = _DateField()
+
     def __init__(self,
                 exchange_symbol="",
                 root_symbol="",
@@ -293,13 +389,16 @@ class Future(Instrument):
         self.delivery_month = delivery_month
         self.delivery_year = delivery_year
 
-        if str(auto_close_date) == 'nan':
+        if auto_close_date is None or str(auto_close_date) == 'nan':
             if first_notice is None :
                 self.auto_close_date = last_trade
             else:
                 self.auto_close_date = first_notice
-        else:
+        elif isinstance(auto_close_date, str):
             self.auto_close_date = eval(auto_close_date)
+        else:
+            # A date, e.g. from to_dict
+            self.auto_close_date = auto_close_date
 
     def to_esid(self):
         text = self.exchange_symbol
@@ -371,6 +470,25 @@ class FixedIncome(Instrument):
         'child_calendar_id'
     })
 
+    __slots__ = (
+        'type',
+        'face_value',
+        'settlement_days',
+        'coupon',
+        'day_counter',
+        '_first_auction_date',
+        '_issue_date',
+        '_effective_date',
+        '_maturity_date',
+        'period',
+        'redemption',
+    )
+
+    first_auction_date = _DateField()
+    issue_date = _DateField()
+    effective_date = _DateField()
+    maturity_date = _DateField()
+
     def __init__(self,
                 exchange_symbol="",
                 instrument_name="",
@@ -502,6 +620,10 @@ class Equity(Instrument):
         'child_calendar_id'
     })
 
+    __slots__ = (
+        'type',
+    )
+
     def __init__(self,
                 exchange_symbol="",
                 instrument_name="",
@@ -581,6 +703,16 @@ class FutureOption(Instrument):
         'end_date',
     })
 
+    __slots__ = (
+        'underlying_future',
+        'root_symbol',
+        '_expiry_date',
+        'strike',
+        'call_put',
+    )
+
+    expiry_date = _DateField()
+
     def __init__(self,
                 exchange_symbol="",
                 root_symbol="",
@@ -1,18 +1,18 @@
+import numpy as np
 import pandas as pd
-from pandas import isnull
 from collections import deque
 from functools import partial
 from abc import ABCMeta
 from numbers import Integral
 from pandas import read_hdf
 from six import with_metaclass, string_types, viewkeys
-from toolz import ( curry, )
 from trading_calendars.utils.memoize import lazyval
 from .financial_center_info import FinancialCenterInfo
 from .exchange_info import ExchangeInfo
 from .country_info import CountryInfo
-from shogun.utils.query_utils import group_into_chunks
 from shogun.utils.functional import invert
+from shogun.database.metadata_registry import get_contract_listing_registry
+from shogun.database.metadata_snapshot import get_metadata_snapshot
 from shogun.errors import (
     EquitiesNotFound,
     FutureContractsNotFound,
@@ -57,36 +57,37 @@ _instrument_timestamp_fields = frozenset({
     'maturity_date',
 })
 
-def _convert_instrument_timestamp_fields(dict_):
+def _timestamp_column(values):
     """
-    Takes in a dict of Instrument init args and converts dates to pd.Timestamps
+    Converts a column of dates to a list of int64 nanoseconds (UTC), with
+    None in place of missing dates. Equal dates share one int object.
     """
-    for key in _instrument_timestamp_fields & viewkeys(dict_):
-        value = pd.Timestamp(dict_[key], tz='UTC')
-        dict_[key] = None if isnull(value) else value
-    return dict_
-
-@curry
-def _filter_kwargs(names, dict_):
-    """Filter out kwargs from a dictionary.
-    Parameters
-    ----------
-    names : set[str]
-        The names to select from ``dict_``.
-    dict_ : dict[str, any]
-        The dictionary to select from.
-    Returns
-    -------
-    kwargs : dict[str, any]
-        ``dict_`` where the keys intersect with ``names`` and the values are
-        not None.
+    dates = pd.to_datetime(values, utc=True)
+    # The dates may be held in a coarser unit than nanoseconds.
+    nanos = _shared_column(
+        np.asarray(dates.values).astype('datetime64[ns]').view(np.int64))
+    for i in np.flatnonzero(dates.isnull().values):
+        nanos[i] = None
+    return nanos
+
+def _shared_column(values):
     """
-    return {k: v for k, v in dict_.items() if k in names and v is not None}
-
-_filter_future_kwargs = _filter_kwargs(Future._kwargnames)
-_filter_future_option_kwargs = _filter_kwargs(FutureOption._kwargnames)
-_filter_equity_kwargs = _filter_kwargs(Equity._kwargnames)
-_filter_fixed_income_kwargs = _filter_kwargs(FixedIncome._kwargnames)
+    Converts a column to a list in which equal values are the same object,
+    so that cached instruments share the repeated names, codes and numbers
+    of a table instead of each holding a copy.
+    """
+    shared = {}
+    return [
+        shared.setdefault((type(value), value), value) for value in values.tolist()
+    ]
+
+# Map from instrument type -> (name of the finder table, instrument class)
+_INSTRUMENT_TABLES = {
+    'Equity': ('_equity_instrument', Equity),
+    'Future': ('_future_instrument', Future),
+    'FutureOption': ('_future_option_instrument', FutureOption),
+    'FixedIncome': ('_fixed_income_instrument', FixedIncome),
+}
 
 def _generate_continuous_future_symbol(root_symbol,
                                                 offset,
@@ -119,23 +120,75 @@ class InstrumentFinder(object):
     :class:`zipline.assets.AssetDBWriter`
     """
 
-    def __init__(self):
-        self._country_code = pd.read_csv(dirname + "\..\database\_CountryCode.csv", keep_default_na=False)
-        self._asset_class = pd.read_csv(dirname + "\..\database\_AssetClass.csv")
-        self._currency_code = pd.read_csv(dirname + "\..\database\_CurrencyCode.csv")
-        self._exchange_code = pd.read_csv(dirname + "\..\database\_ExchangeCode.csv")
-        self._financial_center = pd.read_csv(dirname + "\..\database\_FinancialCenter.csv")
-        self._future_contract_listing = pd.read_csv(dirname + "\..\database\_FutureRootContractListingTable.csv")
-        self._future_root = pd.read_csv(dirname + "\..\database\_FutureRootTable.csv")
-        self._future_instrument = read_hdf(dirname + "\..\database\_FutureInstrument.h5")
-        self._future_option_instrument = pd.read_csv(dirname + "\..\database\_FutureOptionInstrument.csv").set_index('exchange_symbol')
-        self._fixed_income_instrument = read_hdf(dirname + "\..\database\_FixedIncomeInstrument.h5")
-        self._equity_instrument = read_hdf(dirname + "\..\database\_EquityInstrument.h5")
-        self._instrument_router = read_hdf(dirname +'\..\database\_InstrumentRouter.h5')
+    def __init__(self, listing_registry=None, metadata_snapshot=None):
+        if listing_registry is None:
+            listing_registry = get_contract_listing_registry()
+        if metadata_snapshot is None:
+            metadata_snapshot = get_metadata_snapshot()
+        self._listing_registry = listing_registry
+        self._metadata_snapshot = metadata_snapshot
         self._instrument_cache = {}
         self._instrument_type_cache = {}
         self._caches = (self._instrument_cache, self._instrument_type_cache)
         self._ordered_contracts = {}
+        self._table_positions = {}
+
+    # The metadata tables are loaded on first use through the snapshot, so
+    # constructing a finder does not parse any of them.
+    def _load_table(self, name, reader, extension='.csv'):
+        path = dirname + "\..\database\_" + name + extension
+        return self._metadata_snapshot.load(name, path, reader)
+
+    @lazyval
+    def _country_code(self):
+        return self._load_table('CountryCode',
+                                partial(pd.read_csv, keep_default_na=False))
+
+    @lazyval
+    def _asset_class(self):
+        return self._load_table('AssetClass', pd.read_csv)
+
+    @lazyval
+    def _currency_code(self):
+        return self._load_table('CurrencyCode', pd.read_csv)
+
+    @lazyval
+    def _exchange_code(self):
+        return self._load_table('ExchangeCode', pd.read_csv)
+
+    @lazyval
+    def _financial_center(self):
+        return self._load_table('FinancialCenter', pd.read_csv)
+
+    @lazyval
+    def _future_contract_listing(self):
+        return self._listing_registry.table
+
+    @lazyval
+    def _future_root(self):
+        return self._load_table('FutureRootTable', pd.read_csv)
+
+    @lazyval
+    def _future_instrument(self):
+        return self._load_table('FutureInstrument', read_hdf, '.h5')
+
+    @lazyval
+    def _future_option_instrument(self):
+        return self._load_table(
+            'FutureOptionInstrument',
+            lambda path: pd.read_csv(path).set_index('exchange_symbol'))
+
+    @lazyval
+    def _fixed_income_instrument(self):
+        return self._load_table('FixedIncomeInstrument', read_hdf, '.h5')
+
+    @lazyval
+    def _equity_instrument(self):
+        return self._load_table('EquityInstrument', read_hdf, '.h5')
+
+    @lazyval
+    def _instrument_router(self):
+        return self._load_table('InstrumentRouter', read_hdf, '.h5')
 
     @lazyval
     def country_info(self):
@@ -211,15 +264,67 @@ class InstrumentFinder(object):
         except KeyError:
             contract_exchange_symbols = self._get_contract_exchange_symbols(root_symbol)
             contracts = deque(self.retrieve_all(contract_exchange_symbols))
-            oc = OrderedContracts(root_symbol, contracts, active)
+            oc = OrderedContracts(root_symbol, contracts, active,
+                                  listing_registry=self._listing_registry)
             self._ordered_contracts[root_symbol+str(active)] = oc
             return oc
 
-    # May need to implement some sorting
+    def preload_ordered_contracts(self, roots=None, active=True):
+        """
+        Build the OrderedContracts of many root symbols at once.
+        The contracts of every chain are retrieved together, so a strategy
+        trading many roots constructs all of its futures in one pass instead
+        of one pass per root.
+        Parameters
+        ----------
+        roots : iterable[str], optional
+            The root symbols to build. Defaults to every root in the future
+            instrument table.
+        active : bool
+            Whether to build the chains of the active delivery months only.
+        Returns
+        -------
+        ordered_contracts : dict[str -> OrderedContracts]
+        """
+        chains = self._contract_exchange_symbols
+        if roots is None:
+            roots = list(chains)
+        else:
+            roots = list(dict.fromkeys(roots))
+
+        missing = [
+            root_symbol for root_symbol in roots
+            if root_symbol + str(active) not in self._ordered_contracts
+        ]
+        self.retrieve_all([
+            exchange_symbol
+            for root_symbol in missing
+            for exchange_symbol in chains.get(root_symbol, ())
+        ])
+
+        return {
+            root_symbol: self.get_ordered_contracts(root_symbol, active)
+            for root_symbol in roots
+        }
+
+    @lazyval
+    def _contract_exchange_symbols(self):
+        """
+        Map from root_symbol -> exchange_symbols of its contracts in order of
+        last_trade, built in one grouped pass over the future instrument
+        table.
+        """
+        table = self._future_instrument.sort_values(by=['last_trade'],
+                                                    kind='mergesort')
+        exchange_symbols = table.index.get_level_values('exchange_symbol')
+        return {
+            root_symbol: list(exchange_symbols[positions])
+            for root_symbol, positions
+            in table.groupby('root_symbol', sort=False).indices.items()
+        }
+
     def _get_contract_exchange_symbols(self, root_symbol):
-        return list(self._future_instrument[
-                self._future_instrument['root_symbol'] == root_symbol
-                ].sort_values(by=['last_trade']).index)
+        return list(self._contract_exchange_symbols.get(root_symbol, ()))
 
     def _get_root_symbol_exchange(self, root_symbol):
         # assumes there are no dupes in _future_root
@@ -345,16 +450,14 @@ class InstrumentFinder(object):
         if not missing:
             return found
 
-        for instruments in group_into_chunks(missing):
-            query = self._instrument_router[
-                self._instrument_router.index.isin(instruments)
-                ].to_dict()['instrument_type'].items()
-            for exchange_symbol, instrument_type in query:
-                missing.remove(exchange_symbol)
-                found[exchange_symbol] = self._instrument_type_cache[exchange_symbol] = instrument_type
-
-            for exchange_symbol in missing:
-                found[exchange_symbol] = self._instrument_type_cache[exchange_symbol] = None
+        positions = self._symbol_positions('_instrument_router')
+        instrument_types = self._instrument_router['instrument_type'].values
+        type_cache = self._instrument_type_cache
+        for exchange_symbol in missing:
+            position = positions.get(exchange_symbol)
+            found[exchange_symbol] = type_cache[exchange_symbol] = (
+                None if position is None else instrument_types[position]
+            )
 
         return found
 
@@ -375,7 +478,7 @@ class InstrumentFinder(object):
         EquitiesNotFound
             When any requested instrument isn't found.
         """
-        return self._retrieve_instruments(exchange_symbols, self._equity_instrument, Equity)
+        return self._retrieve_instruments(exchange_symbols, '_equity_instrument', Equity)
 
     def retrieve_futures_contracts(self, exchange_symbols):
         """
@@ -394,7 +497,7 @@ class InstrumentFinder(object):
         FuturesContractsNotFound
             When any requested instrument isn't found.
         """
-        return self._retrieve_instruments(exchange_symbols, self._future_instrument, Future)
+        return self._retrieve_instruments(exchange_symbols, '_future_instrument', Future)
 
     def retrieve_future_option_contracts(self, exchange_symbols):
         """
@@ -413,7 +516,7 @@ class InstrumentFinder(object):
         FutureOptionContractsNotFound
             When any requested instrument isn't found.
         """
-        return self._retrieve_instruments(exchange_symbols, self._future_option_instrument, FutureOption)
+        return self._retrieve_instruments(exchange_symbols, '_future_option_instrument', FutureOption)
 
     def retrieve_fixed_income(self, exchange_symbols):
         """
@@ -432,19 +535,52 @@ class InstrumentFinder(object):
         FixedIncomeNotFound
             When any requested instrument isn't found.
         """
-        return self._retrieve_instruments(exchange_symbols, self._fixed_income_instrument, FixedIncome)
+        return self._retrieve_instruments(exchange_symbols, '_fixed_income_instrument', FixedIncome)
 
-    def _retrieve_instruments(self, exchange_symbols, instrument_hdf, instrument_type):
+    def retrieve_all_of_type(self, instrument_type):
+        """
+        Retrieve every instrument of one type.
+        Parameters
+        ----------
+        instrument_type : str
+            One of 'Equity', 'Future', 'FutureOption' or 'FixedIncome'.
+        Returns
+        -------
+        instruments : list[Instrument]
+            Every instrument in the table of ``instrument_type``, in the order
+            of the table.
+        """
+        try:
+            table_name, instrument_class = _INSTRUMENT_TABLES[instrument_type]
+        except KeyError:
+            raise ValueError(
+                'Invalid instrument type {!r}. Allowed instrument types are '
+                '{}.'.format(instrument_type, sorted(_INSTRUMENT_TABLES))
+            )
+
+        table = getattr(self, table_name)
+        exchange_symbols = table.index.get_level_values('exchange_symbol')
+        cache = self._instrument_cache
+        cached = exchange_symbols.isin(list(cache))
+        if not cached.all():
+            self._build_instruments(table[~cached], instrument_class)
+
+        self._instrument_type_cache.update(
+            dict.fromkeys(exchange_symbols, instrument_type)
+        )
+        return [cache[exchange_symbol] for exchange_symbol in exchange_symbols]
+
+    def _retrieve_instruments(self, exchange_symbols, table_name, instrument_type):
         """
         Internal function for loading instruments from a table.
-        This should be the only method of `InstrumentFinder` that writes instruments
-        into self._instrument_cache.
+        Together with `retrieve_all_of_type` this should be the only method of
+        `InstrumentFinder` that writes instruments into self._instrument_cache.
         Parameters
         ---------
         exchange_symbols : list of str
             Instrument ids to look up.
-        instrument_hdf : Pandas hdf
-            Table from which to query instruments.
+        table_name : str
+            Name of the finder table from which to query instruments.
         asset_type : type
             Type of instrument to be constructed.
         Returns
@@ -456,38 +592,9 @@ class InstrumentFinder(object):
         if not exchange_symbols:
             return {}
 
-        cache = self._instrument_cache
-        hits = {}
-
-        querying_equities = issubclass(instrument_type, Equity)
-        querying_futures = issubclass(instrument_type, Future)
-        querying_fixed_income = issubclass(instrument_type, FixedIncome)
-        querying_future_option = issubclass(instrument_type, FutureOption)
-        filter_kwargs = (
-            _filter_equity_kwargs
-            if querying_equities else
-            _filter_future_kwargs
-            if querying_futures else
-            _filter_fixed_income_kwargs
-            if querying_fixed_income else
-            _filter_future_option_kwargs
-        )
-
-        # FutureOption instruments take a Future object as an input, hack here
-        if querying_future_option:
-            rows = self._retrieve_instrument_dicts(exchange_symbols, instrument_hdf)
-            for row in rows:
-                underlying_future_symbol = row['underlying_future']
-                row['underlying_future'] = self.retrieve_instrument(underlying_future_symbol)
-                exchange_symbol = row['exchange_symbol']
-                instrument = instrument_type(**filter_kwargs(row))
-                hits[exchange_symbol] = cache[exchange_symbol] = instrument
-        else:
-            rows = self._retrieve_instrument_dicts(exchange_symbols, instrument_hdf)
-            for row in rows:
-                exchange_symbol = row['exchange_symbol']
-                instrument = instrument_type(**filter_kwargs(row))
-                hits[exchange_symbol] = cache[exchange_symbol] = instrument
+        query = self._select_instruments_by_exchange_symbol(
+            table_name, exchange_symbols)
+        hits = self._build_instruments(query, instrument_type)
 
         # If we get here, it means something in our code thought that a
         # particular sid was an equity/future and called this function with a
@@ -495,43 +602,102 @@ class InstrumentFinder(object):
         # an error in our code, not a user-input error.
         misses = tuple(set(exchange_symbols) - viewkeys(hits))
         if misses:
-            if querying_equities:
+            if issubclass(instrument_type, Equity):
                 raise EquitiesNotFound(exchange_symbols=misses)
-            elif querying_futures:
+            elif issubclass(instrument_type, Future):
                 raise FutureContractsNotFound(exchange_symbols=misses)
-            elif querying_fixed_income:
+            elif issubclass(instrument_type, FixedIncome):
                 raise FixedIncomeNotFound(exchange_symbols=misses)
             else:
                 raise FutureOptionContractsNotFound(exchange_symbols=misses)
 
         return hits
 
-    def _retrieve_instrument_dicts(self, exchange_symbols, instrument_hdf):
-        if not exchange_symbols:
-            return
-
-        def mkdict(row, exchanges=self.exchange_info):
-            d = dict(row)
-            if 'exchange_id' in d:
-                d['exchange_info'] = exchanges[d.pop('exchange_id')]
-            elif 'exchange_info' in d:
-                d['exchange_info'] = exchanges[d.pop('exchange_info')]
-            return d
-
-        for instruments in group_into_chunks(exchange_symbols):
-            # Load misses from the db
-            query = self._select_instruments_by_exchange_symbol(instrument_hdf, instruments)
-            query.reset_index(level=[0], inplace=True)
-            for index, row in query.iterrows():
-                yield _convert_instrument_timestamp_fields(mkdict(row)) # We don't need this, hdf stores pandas object
-                #yield mkdict(row)
-
-    @staticmethod
-    def _select_instruments_by_exchange_symbol(instrument_hdf, exchange_symbols):
-        return instrument_hdf[
-#0.23 pandas            instrument_hdf.index.isin(exchange_symbols)
-            instrument_hdf.index.isin(exchange_symbols, level='exchange_symbol')
-            ]
+    def _build_instruments(self, query, instrument_type):
+        """
+        Construct an instrument of ``instrument_type`` for every row of
+        ``query`` and write them into self._instrument_cache.
+        Returns
+        -------
+        assets : dict[str -> Instrument]
+            Dict mapping the exchange_symbols of ``query`` to the instruments.
+        """
+        cache = self._instrument_cache
+        hits = {}
+
+        rows = self._instrument_kwargs(query, instrument_type._kwargnames)
+
+        # FutureOption instruments take a Future object as an input, so the
+        # underlying futures are retrieved together before the options.
+        if issubclass(instrument_type, FutureOption):
+            rows = list(rows)
+            underlying_symbols = list(dict.fromkeys(
+                row['underlying_future'] for row in rows
+            ))
+            underlying_futures = dict(zip(
+                underlying_symbols, self.retrieve_all(underlying_symbols)
+            ))
+            for row in rows:
+                row['underlying_future'] = underlying_futures[row['underlying_future']]
+
+        for row in rows:
+            exchange_symbol = row['exchange_symbol']
+            hits[exchange_symbol] = cache[exchange_symbol] = instrument_type(**row)
+
+        return hits
+
+    def _instrument_kwargs(self, query, kwargnames):
+        """
+        Yields the constructor kwargs of each row of ``query``.
+        Each column is converted once as a whole, then the kwargs are zipped
+        together from the columns; as for a single instrument, a value of
+        None is left out so the constructor default applies.
+        """
+        query = query.reset_index(level=[0])
+        names, columns = [], []
+        for name in query.columns:
+            values = query[name]
+            if name in ('exchange_id', 'exchange_info'):
+                exchanges = self.exchange_info
+                name = 'exchange_info'
+                values = [exchanges[exchange] for exchange in values.values]
+            elif name not in kwargnames:
+                continue
+            elif name in _instrument_timestamp_fields:
+                values = _timestamp_column(values)
+            else:
+                values = _shared_column(values)
+            if name in kwargnames:
+                names.append(name)
+                columns.append(values)
+
+        for row in zip(*columns):
+            yield {
+                name: value for name, value in zip(names, row) if value is not None
+            }
+
+    def _symbol_positions(self, table_name):
+        """
+        Returns the map from exchange_symbol -> row position in the finder
+        table ``table_name``, which is built the first time it is needed.
+        """
+        try:
+            return self._table_positions[table_name]
+        except KeyError:
+            exchange_symbols = getattr(self, table_name).index.get_level_values(
+                'exchange_symbol')
+            positions = self._table_positions[table_name] = dict(
+                zip(exchange_symbols, range(len(exchange_symbols)))
+            )
+            return positions
+
+    def _select_instruments_by_exchange_symbol(self, table_name, exchange_symbols):
+        positions = self._symbol_positions(table_name)
+        return getattr(self, table_name).take([
+            positions[exchange_symbol]
+            for exchange_symbol in dict.fromkeys(exchange_symbols)
+            if exchange_symbol in positions
+        ])
 
 class InstrumentConvertible(with_metaclass(ABCMeta)):
     """
@@ -1,12 +1,196 @@
 from abc import ABCMeta, abstractmethod
+from bisect import bisect_right
+import numpy as np
 from six import with_metaclass
 
+from shogun.utils.memoize import lazyval
+
 # Number of days over which to compute rolls when finding the current contract
 # for a volume-rolling contract chain. For more details on why this is needed,
 # see `VolumeRollFinder.get_contract_center`.
 ROLL_DAYS_FOR_CURRENT_CONTRACT = 90
 
 
+class RollSchedule(object):
+    """
+    The rolls of a contract chain over a contiguous range of sessions.
+    Parameters
+    ----------
+    start : Timestamp
+        The first session covered by the schedule.
+    end : Timestamp
+        The last session covered by the schedule.
+    rolls : list[tuple(exchange_symbol, roll_date)]
+        The rolls between ``start`` and ``end``, as returned by
+        ``RollFinder.get_rolls``.
+    """
+    def __init__(self, start, end, rolls):
+        self.start = start
+        self.end = end
+        # symbols[i] is active from roll_dates[i - 1] up to roll_dates[i].
+        self.symbols = [exchange_symbol for exchange_symbol, _ in rolls]
+        self.roll_dates = [roll_date for _, roll_date in rolls[:-1]]
+
+    def extend(self, end, rolls):
+        """
+        Extend the schedule to ``end`` with the rolls from ``self.end`` to
+        ``end``.
+        """
+        self.symbols[-1:] = [exchange_symbol for exchange_symbol, _ in rolls]
+        self.roll_dates.extend(roll_date for _, roll_date in rolls[:-1])
+        self.end = end
+
+    def prepend(self, start, rolls):
+        """
+        Extend the schedule back to ``start`` with the rolls from ``start``
+        to ``self.start``.
+        """
+        self.symbols[:0] = [exchange_symbol for exchange_symbol, _ in rolls[:-1]]
+        self.roll_dates[:0] = [roll_date for _, roll_date in rolls[:-1]]
+        self.start = start
+
+    def rolls(self, start, end):
+        """
+        Returns the rolls between ``start`` and ``end``, which must lie within
+        the schedule, in the format of ``RollFinder.get_rolls``.
+        """
+        lo = bisect_right(self.roll_dates, start)
+        hi = bisect_right(self.roll_dates, end)
+        return list(zip(self.symbols[lo:hi + 1], self.roll_dates[lo:hi] + [None]))
+
+
+class VolumeRollCalendar(object):
+    """
+    The daily active contract of a futures chain which rolls on volume.
+    For every pair of consecutive contracts, the session-by-session result of
+    ``VolumeRollFinder._active_contract`` is computed with array operations
+    over the volume matrix of the chain. As in ``RollFinder.get_rolls``, the
+    chain rolls from a contract to the next on the first session of the run
+    of sessions, ending at the front contract's auto close date, on which
+    the back contract is active.
+    Parameters
+    ----------
+    sessions : DatetimeIndex
+        The sessions covered by the calendar.
+    contracts : list of Future
+        The contracts of the chain in order of occurrence.
+    volumes : np.ndarray
+        The volume of each contract on each session, with shape
+        (len(sessions), len(contracts)).
+    trading_day : CustomBusinessDay
+        The trading day of the calendar of ``sessions``.
+    grace_days : int
+        The number of trading days before the front contract's auto close
+        date within which a single volume flip rolls the chain.
+    Attributes
+    ----------
+    exchange_symbols : np.ndarray[object]
+        The exchange_symbols of the chain.
+    roll_ix : np.ndarray[int64]
+        The index of the session on which the chain rolls from each contract
+        to the next.
+    primary_ix : np.ndarray[int64]
+        The position in the chain of the primary contract on each session.
+    """
+    def __init__(self, sessions, contracts, volumes, trading_day, grace_days):
+        self.sessions = sessions
+        self.exchange_symbols = np.array(
+            [contract.exchange_symbol for contract in contracts], dtype=object)
+
+        sessions_ns = sessions.asi8
+        start = np.array([c.start_date.value for c in contracts], dtype=np.int64)
+        auto_close = np.array([c.auto_close_date.value for c in contracts], dtype=np.int64)
+        close = np.minimum(
+            auto_close,
+            np.array([c.end_date.value for c in contracts], dtype=np.int64))
+        # flips[:, i] is whether contract i + 1 outtraded contract i.
+        flips = volumes[:, 1:] > volumes[:, :-1]
+
+        num_sessions = len(sessions_ns)
+        self.roll_ix = np.zeros(max(len(contracts) - 1, 0), dtype=np.int64)
+        for i in range(len(self.roll_ix)):
+            lo = sessions_ns.searchsorted(auto_close[i - 1]) if i else 0
+            hi = sessions_ns.searchsorted(auto_close[i], side='right')
+            dt_ix = np.arange(max(lo, 1), min(hi, num_sessions))
+            prev_ix = dt_ix - 1
+            dt = sessions_ns[dt_ix]
+            prev = sessions_ns[prev_ix]
+
+            gap_start = max(
+                start[i + 1],
+                (contracts[i].auto_close_date - trading_day * grace_days).value,
+            )
+            gap_start_ix = sessions_ns.searchsorted(gap_start)
+            flip_count = np.concatenate([[0], np.cumsum(flips[:, i])])
+            # Whether a flip happened between gap_start and the session
+            # before prev.
+            flipped_in_gap = flip_count[prev_ix] - \
+                flip_count[np.minimum(gap_start_ix, prev_ix)] > 0
+
+            back_active = np.select(
+                [dt > close[i],
+                 start[i] > prev,
+                 dt > close[i + 1],
+                 start[i + 1] > prev,
+                 flips[prev_ix, i],
+                 dt < gap_start],
+                [True, True, False, False, True, False],
+                flipped_in_gap,
+            )
+
+            front_active = np.flatnonzero(~back_active)
+            if len(front_active):
+                roll = dt_ix[front_active[-1]] + 1
+            else:
+                roll = lo
+            self.roll_ix[i] = max(roll, self.roll_ix[i - 1]) if i else roll
+
+        self.primary_ix = self.roll_ix.searchsorted(
+            np.arange(num_sessions), side='right')
+
+    def _exchange_symbols(self, ix):
+        return [self.exchange_symbols[i] if i < len(self.exchange_symbols) else None
+                for i in ix]
+
+    def _session_ix(self, dt):
+        """
+        Returns the index of the session ``dt``, or None if it is outside of
+        the calendar.
+        """
+        sessions_ns = self.sessions.asi8
+        if not len(sessions_ns) or not sessions_ns[0] <= dt.value <= sessions_ns[-1]:
+            return None
+        return sessions_ns.searchsorted(dt.value)
+
+    def contract_at(self, session, offset):
+        """
+        Returns the exchange_symbol of the contract at ``offset`` from the
+        primary contract on ``session``, or None if ``session`` is outside of
+        the calendar or the chain is too short.
+        """
+        ix = self._session_ix(session)
+        if ix is None:
+            return None
+        return self._exchange_symbols([self.primary_ix[ix] + offset])[0]
+
+    def rolls(self, start, end, offset):
+        """
+        Returns the rolls between the sessions ``start`` and ``end`` in the
+        format of ``RollFinder.get_rolls``, or None if the range is not
+        covered by the calendar.
+        """
+        start_ix = self._session_ix(start)
+        end_ix = self._session_ix(end)
+        if start_ix is None or end_ix is None:
+            return None
+        primary = self.primary_ix[start_ix:end_ix + 1]
+        changes = np.flatnonzero(np.diff(primary)) + 1
+        exchange_symbols = self._exchange_symbols(
+            primary[np.concatenate([[0], changes])] + offset)
+        roll_dates = [self.sessions[start_ix + change] for change in changes]
+        return list(zip(exchange_symbols, roll_dates + [None]))
+
+
 class RollFinder(with_metaclass(ABCMeta, object)):
     """
     Abstract base class for calculating when futures contracts are the active
@@ -16,6 +200,14 @@ class RollFinder(with_metaclass(ABCMeta, object)):
     def _active_contract(self, oc, front, back, dt):
         raise NotImplementedError
 
+    @lazyval
+    def _roll_schedules(self):
+        """
+        Map from (root_symbol, offset, active) -> RollSchedule of the rolls
+        computed so far by this finder.
+        """
+        return {}
+
     def _get_active_contract_at_offset(self, root_symbol, dt, offset, active):
         """
         For the given root symbol, find the contract that is considered active
@@ -69,6 +261,37 @@ class RollFinder(with_metaclass(ABCMeta, object)):
         and the `roll_date` on which to hop to the next contract.
             The last pair in the chain has a value of `None` since the roll
             is after the range.
+        Notes
+        -----
+        The rolls of each (root_symbol, offset, active) are cached. Requests
+        within the cached range are answered by bisecting the cached roll
+        dates, and requests past either end only compute the rolls of the
+        missing sessions.
+        """
+        tc = self.trading_calendar
+        start = tc.minute_to_session_label(start)
+        end = tc.minute_to_session_label(end)
+        key = (root_symbol, offset, active)
+
+        try:
+            schedule = self._roll_schedules[key]
+        except KeyError:
+            rolls = self._compute_rolls(root_symbol, start, end, offset, active)
+            self._roll_schedules[key] = RollSchedule(start, end, rolls)
+            return rolls
+
+        if start < schedule.start:
+            schedule.prepend(start, self._compute_rolls(
+                root_symbol, start, schedule.start, offset, active))
+        if end > schedule.end:
+            schedule.extend(end, self._compute_rolls(
+                root_symbol, schedule.end, end, offset, active))
+        return schedule.rolls(start, end)
+
+    def _compute_rolls(self, root_symbol, start, end, offset, active):
+        """
+        Compute the rolls between ``start`` and ``end`` without consulting
+        the cache. See ``get_rolls``.
         """
         oc = self.instrument_finder.get_ordered_contracts(root_symbol, active)
         front = self._get_active_contract_at_offset(root_symbol, end, 0, active)
@@ -150,6 +373,66 @@ class VolumeRollFinder(RollFinder):
         self.instrument_finder = instrument_finder
         self.session_reader = session_reader
 
+    @lazyval
+    def _volume_roll_calendars(self):
+        return {}
+
+    def volume_roll_calendar(self, root_symbol, active=True):
+        """
+        Returns the VolumeRollCalendar of the chain of ``root_symbol``, built
+        from a single read of the volume of every contract in the chain, or
+        None if the chain has no sessions with data.
+        """
+        key = (root_symbol, active)
+        try:
+            return self._volume_roll_calendars[key]
+        except KeyError:
+            pass
+
+        oc = self.instrument_finder.get_ordered_contracts(root_symbol, active)
+        contracts = []
+        node = oc._head_contract
+        while node is not None:
+            contracts.append(node.contract)
+            node = node.next
+
+        calendar = None
+        if contracts:
+            tc = self.trading_calendar
+            start = max(min(c.start_date for c in contracts),
+                        self.session_reader.first_trading_day)
+            end = min(max(c.auto_close_date for c in contracts),
+                      self.session_reader.last_available_dt)
+            sessions = tc.sessions_in_range(tc.minute_to_session_label(start),
+                                            tc.minute_to_session_label(end))
+            if len(sessions):
+                volumes = self.session_reader.load_raw_arrays(
+                    ['volume'], sessions[0], sessions[-1], contracts)[0]
+                calendar = VolumeRollCalendar(sessions,
+                                              contracts,
+                                              np.nan_to_num(volumes),
+                                              tc.day,
+                                              self.GRACE_DAYS)
+        self._volume_roll_calendars[key] = calendar
+        return calendar
+
+    def get_rolls(self, root_symbol, start, end, offset, active):
+        """
+        Get the rolls from the chain's ``volume_roll_calendar``, falling back
+        to walking the chain when the range is not covered by it.
+        See ``RollFinder.get_rolls``.
+        """
+        calendar = self.volume_roll_calendar(root_symbol, active)
+        if calendar is not None:
+            tc = self.trading_calendar
+            rolls = calendar.rolls(tc.minute_to_session_label(start),
+                                   tc.minute_to_session_label(end),
+                                   offset)
+            if rolls is not None:
+                return rolls
+        return super(VolumeRollFinder, self).get_rolls(
+            root_symbol, start, end, offset, active)
+
     def _active_contract(self, oc, front, back, dt):
         """
         Return the active contract based on the previous trading day's volume.
@@ -243,6 +526,13 @@ class VolumeRollFinder(RollFinder):
         # the surrounding rolls is required. The `get_rolls` logic prevents
         # contracts from being considered active once they have rolled, so
         # incorporating that logic here prevents flip-flopping.
+        calendar = self.volume_roll_calendar(root_symbol, active)
+        if calendar is not None:
+            exchange_symbol = calendar.contract_at(
+                self.trading_calendar.minute_to_session_label(dt), offset)
+            if exchange_symbol is not None:
+                return self.instrument_finder.retrieve_instrument(exchange_symbol)
+
         day = self.trading_calendar.day
         end_date = min(
             dt + (ROLL_DAYS_FOR_CURRENT_CONTRACT * day),
@@ -0,0 +1,139 @@
+import numpy as np
+import pandas as pd
+import trading_calendars
+
+from shogun.utils.memoize import lazyval
+
+
+def _as_nanos(dts):
+    """
+    Returns ``dts`` as an array of int64 nanoseconds (UTC). Tz-naive dates
+    are taken to be UTC.
+    """
+    if not isinstance(dts, pd.DatetimeIndex):
+        dts = pd.DatetimeIndex(np.atleast_1d(dts))
+    return dts.values.astype('datetime64[ns]').view(np.int64)
+
+
+class CalendarArrays(object):
+    """
+    A trading calendar with its sessions, opens and closes precomputed as
+    int64 nanosecond arrays, so that many dates can be checked at once.
+    Parameters
+    ----------
+    calendar : TradingCalendar
+        The calendar to wrap.
+    """
+    def __init__(self, calendar):
+        self.calendar = calendar
+
+    @lazyval
+    def sessions(self):
+        """
+        The session labels of the calendar, as int64 nanoseconds.
+        """
+        return _as_nanos(self.calendar.all_sessions)
+
+    @lazyval
+    def opens(self):
+        """
+        The first minute of each session, as int64 nanoseconds.
+        """
+        return _as_nanos(self.calendar.schedule['market_open'])
+
+    @lazyval
+    def closes(self):
+        """
+        The last minute of each session, as int64 nanoseconds.
+        """
+        return _as_nanos(self.calendar.schedule['market_close'])
+
+    def is_session(self, dts):
+        """
+        Parameters
+        ----------
+        dts : array-like of datetime64-like
+            Dates to check, as session labels (midnight UTC).
+        Returns
+        -------
+        np.ndarray[bool]
+            Whether each date is a session of the calendar.
+        """
+        nanos = _as_nanos(dts)
+        sessions = self.sessions
+        ix = sessions.searchsorted(nanos)
+        out = ix < len(sessions)
+        out[out] = sessions[ix[out]] == nanos[out]
+        return out
+
+    def is_open_on_minute(self, dts):
+        """
+        Parameters
+        ----------
+        dts : array-like of datetime64-like
+            Minutes to check.
+        Returns
+        -------
+        np.ndarray[bool]
+            Whether the calendar is open on each minute.
+        Notes
+        -----
+        A minute is open if it falls between the open and the close of a
+        session, both inclusive, which matches
+        ``TradingCalendar.is_open_on_minute``.
+        """
+        nanos = _as_nanos(dts)
+        opens = self.opens
+        open_ix = opens.searchsorted(nanos)
+        close_ix = self.closes.searchsorted(nanos)
+        out = open_ix != close_ix
+        # A minute equal to an open has the same open and close index.
+        on_open = ~out & (open_ix < len(opens))
+        out[on_open] = opens[open_ix[on_open]] == nanos[on_open]
+        return out
+
+
+class CalendarRegistry(object):
+    """
+    Resolves each (exchange, product group) trading calendar once and keeps
+    it, with its session arrays, for the life of the registry.
+    """
+    def __init__(self):
+        self._calendars = {}
+
+    def get_calendar_arrays(self, exchange_id, product_group_id=None):
+        """
+        Returns the CalendarArrays of the calendar of ``exchange_id``, or of
+        its ``product_group_id`` calendar if given.
+        """
+        key = exchange_id, product_group_id
+        try:
+            return self._calendars[key]
+        except KeyError:
+            if product_group_id is None:
+                calendar = trading_calendars.get_calendar(exchange_id)
+            else:
+                calendar = trading_calendars.get_calendar(exchange_id,
+                                                          product_group_id)
+            arrays = self._calendars[key] = CalendarArrays(calendar)
+            return arrays
+
+    def get_calendar(self, exchange_id, product_group_id=None):
+        """
+        Returns the trading calendar of ``exchange_id``, or of its
+        ``product_group_id`` calendar if given.
+        """
+        return self.get_calendar_arrays(exchange_id, product_group_id).calendar
+
+
+_calendar_registry = None
+
+
+def get_calendar_registry():
+    """
+    Returns the process-wide CalendarRegistry.
+    """
+    global _calendar_registry
+    if _calendar_registry is None:
+        _calendar_registry = CalendarRegistry()
+    return _calendar_registry
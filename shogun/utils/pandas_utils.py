@@ -326,3 +326,38 @@ def check_indexes_all_same(indexes, message="Indexes are not equal."):
                     message, bad_loc, first[bad_loc], other[bad_loc]
                 ),
             )
+
+
+def write_hdf_session_bounds(path, key, df):
+    """
+    Store the first and last dates of a ('date', ...) indexed table as the
+    ``start_session_ns`` and ``end_session_ns`` attributes of ``key``.
+    """
+    dates = df.index.get_level_values(0)
+    with pd.HDFStore(path, mode='a') as store:
+        attrs = store.get_storer(key).attrs
+        attrs.start_session_ns = pd.Timestamp(dates.min()).value
+        attrs.end_session_ns = pd.Timestamp(dates.max()).value
+
+
+def read_hdf_session_bounds(path):
+    """
+    Read the epoch ns of the first and last dates of the table in ``path``
+    without loading it.
+    The bounds are taken from the attributes written by
+    ``write_hdf_session_bounds`` if present, otherwise from the first and last
+    rows of the table, which is written sorted by date.
+    """
+    with pd.HDFStore(path, mode='r') as store:
+        key = store.keys()[0]
+        storer = store.get_storer(key)
+        attrs = storer.attrs
+        if 'start_session_ns' in attrs and 'end_session_ns' in attrs:
+            return int(attrs.start_session_ns), int(attrs.end_session_ns)
+        nrows = storer.nrows
+        first = store.select(key, start=0, stop=1)
+        last = store.select(key, start=nrows - 1, stop=nrows)
+    return (
+        pd.Timestamp(first.index.get_level_values(0)[0]).value,
+        pd.Timestamp(last.index.get_level_values(0)[0]).value,
+    )
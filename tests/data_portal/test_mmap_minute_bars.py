@@ -0,0 +1,97 @@
+import numpy as np
+import pandas as pd
+import pytest
+from trading_calendars import get_calendar
+
+from shogun.data_portal.hdf_daily_bars import BAR_COLUMNS
+from shogun.data_portal.mmap_minute_bars import (
+    MmapMinuteBarReader,
+    MmapMinuteBarWriter,
+)
+from shogun.data_portal.resample import ReindexMinuteBarReader
+
+EXCHANGE_SYMBOL = 'CLF19'
+
+
+@pytest.fixture
+def calendar():
+    return get_calendar('XNYS')
+
+
+@pytest.fixture
+def sessions(calendar):
+    return calendar.sessions_in_range(pd.Timestamp('2019-01-02', tz='UTC'),
+                                      pd.Timestamp('2019-01-31', tz='UTC'))
+
+
+@pytest.fixture
+def reader(tmpdir, calendar, sessions):
+    """
+    A store holding a bar on every minute of sessions[5] to sessions[9],
+    with the bar's position among those minutes as its close.
+    """
+    start_session, end_session = sessions[5], sessions[9]
+    minutes = calendar.minutes_in_range(
+        calendar.open_and_close_for_session(start_session)[0],
+        calendar.open_and_close_for_session(end_session)[1])
+    index = pd.MultiIndex.from_arrays(
+        [minutes, [EXCHANGE_SYMBOL] * len(minutes)],
+        names=['date', 'exchange_symbol'])
+    df = pd.DataFrame({column: np.arange(len(minutes), dtype=np.float64)
+                       for column in BAR_COLUMNS}, index=index)
+    df['volume'] = 1.0
+
+    writer = MmapMinuteBarWriter(str(tmpdir), calendar,
+                                 start_session, end_session)
+    writer.write(df)
+    return MmapMinuteBarReader(str(tmpdir), calendar)
+
+
+def _window(calendar, first_session, last_session):
+    return (calendar.open_and_close_for_session(first_session)[0],
+            calendar.open_and_close_for_session(last_session)[1])
+
+
+def test_load_raw_arrays_straddling_store_bounds(calendar, sessions, reader):
+    start_dt, end_dt = _window(calendar, sessions[2], sessions[12])
+    minutes = calendar.minutes_in_range(start_dt, end_dt)
+
+    close, volume = reader.load_raw_arrays(['close', 'volume'],
+                                           start_dt, end_dt,
+                                           [EXCHANGE_SYMBOL])
+
+    assert close.shape == volume.shape == (len(minutes), 1)
+    in_store = (minutes >= reader.first_trading_day) & \
+        (minutes <= reader.last_available_dt)
+    assert in_store.any() and not in_store.all()
+    np.testing.assert_array_equal(close[in_store, 0],
+                                  np.arange(in_store.sum()))
+    np.testing.assert_array_equal(volume[in_store, 0], 1)
+    assert np.isnan(close[~in_store, 0]).all()
+    np.testing.assert_array_equal(volume[~in_store, 0], 0)
+
+
+def test_load_raw_arrays_outside_store(calendar, sessions, reader):
+    start_dt, end_dt = _window(calendar, sessions[12], sessions[13])
+    minutes = calendar.minutes_in_range(start_dt, end_dt)
+
+    close, volume = reader.load_raw_arrays(['close', 'volume'],
+                                           start_dt, end_dt,
+                                           [EXCHANGE_SYMBOL])
+
+    assert close.shape == volume.shape == (len(minutes), 1)
+    assert np.isnan(close).all()
+    np.testing.assert_array_equal(volume, 0)
+
+
+def test_reindex_straddling_store_bounds(calendar, sessions, reader):
+    reindex_reader = ReindexMinuteBarReader(calendar, reader,
+                                            sessions[0], sessions[-1])
+    start_dt, end_dt = _window(calendar, sessions[8], sessions[12])
+
+    close, = reindex_reader.load_raw_arrays(['close'], start_dt, end_dt,
+                                            [EXCHANGE_SYMBOL])
+
+    assert close.shape == (len(calendar.minutes_in_range(start_dt, end_dt)), 1)
+    assert not np.isnan(close[0, 0])
+    assert np.isnan(close[-1, 0])
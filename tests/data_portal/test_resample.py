@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import pytest
+from trading_calendars import get_calendar
+
+from shogun.data_portal.hdf_daily_bars import BAR_COLUMNS
+from shogun.data_portal.mmap_minute_bars import (
+    MmapMinuteBarReader,
+    MmapMinuteBarWriter,
+)
+from shogun.data_portal.resample import (
+    MinuteResampleSessionBarReader,
+    _first_valid,
+    _last_valid,
+)
+
+EXCHANGE_SYMBOL = 'CLF19'
+
+
+def test_first_valid():
+    data = np.array([[1.0, np.nan],
+                     [2.0, 5.0],
+                     [np.nan, np.nan],
+                     [np.nan, 7.0],
+                     [4.0, np.nan]])
+    starts = np.array([0, 2, 4])
+
+    result = _first_valid(data, ~np.isnan(data), starts, -1.0)
+
+    np.testing.assert_array_equal(result, [[1.0, 5.0],
+                                           [-1.0, 7.0],
+                                           [4.0, -1.0]])
+
+
+def test_last_valid():
+    data = np.array([[1.0, np.nan],
+                     [2.0, 5.0],
+                     [np.nan, np.nan],
+                     [np.nan, 7.0],
+                     [4.0, np.nan]])
+    starts = np.array([0, 2, 4])
+
+    result = _last_valid(data, ~np.isnan(data), starts, -1.0)
+
+    np.testing.assert_array_equal(result, [[2.0, 5.0],
+                                           [-1.0, 7.0],
+                                           [4.0, -1.0]])
+
+
+@pytest.fixture
+def calendar():
+    return get_calendar('XNYS')
+
+
+@pytest.fixture
+def sessions(calendar):
+    return calendar.sessions_in_range(pd.Timestamp('2019-01-02', tz='UTC'),
+                                      pd.Timestamp('2019-01-31', tz='UTC'))
+
+
+@pytest.fixture
+def reader(tmpdir, calendar, sessions):
+    """
+    Session bars resampled from a store holding a bar on every minute of
+    sessions[5] to sessions[9], with the bar's position among the minutes
+    of its session as its close.
+    """
+    start_session, end_session = sessions[5], sessions[9]
+    frames = []
+    for session in sessions[5:10]:
+        minutes = calendar.minutes_in_range(
+            *calendar.open_and_close_for_session(session))
+        frames.append(pd.DataFrame(
+            {column: np.arange(len(minutes), dtype=np.float64)
+             for column in BAR_COLUMNS},
+            index=pd.MultiIndex.from_arrays(
+                [minutes, [EXCHANGE_SYMBOL] * len(minutes)],
+                names=['date', 'exchange_symbol']),
+        ))
+    df = pd.concat(frames)
+    df['volume'] = 1.0
+
+    writer = MmapMinuteBarWriter(str(tmpdir), calendar,
+                                 start_session, end_session)
+    writer.write(df)
+    return MinuteResampleSessionBarReader(
+        calendar, MmapMinuteBarReader(str(tmpdir), calendar))
+
+
+def test_load_raw_arrays_outside_minute_bars(calendar, sessions, reader):
+    requested = sessions[2:13]
+
+    close, volume = reader.load_raw_arrays(['close', 'volume'],
+                                           requested[0], requested[-1],
+                                           [EXCHANGE_SYMBOL])
+
+    assert close.shape == volume.shape == (len(requested), 1)
+    in_store = (requested >= sessions[5]) & (requested <= sessions[9])
+    for i in np.flatnonzero(in_store):
+        minutes = calendar.minutes_in_range(
+            *calendar.open_and_close_for_session(requested[i]))
+        assert close[i, 0] == len(minutes) - 1
+        assert volume[i, 0] == len(minutes)
+    assert np.isnan(close[~in_store, 0]).all()
+    np.testing.assert_array_equal(volume[~in_store, 0], 0)
+
+
+def test_load_raw_arrays_after_minute_bars(sessions, reader):
+    close, volume = reader.load_raw_arrays(['close', 'volume'],
+                                           sessions[12], sessions[14],
+                                           [EXCHANGE_SYMBOL])
+
+    assert np.isnan(close).all()
+    np.testing.assert_array_equal(volume, 0)